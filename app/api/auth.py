@@ -1,14 +1,18 @@
+import hashlib
+import time
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
 from datetime import timedelta
 
 from app.config import settings
 from app.infrastructure.database.database import get_db
 from app.infrastructure.database.repositories.user_repository import UserRepository
 from app.application.auth_service import AuthService
+from app.infrastructure.cache.ttl_cache import TTLCache
 from app.schemas.auth import UserCreate, UserResponse, Token, TokenData, UserLogin
 
 # 创建路由器
@@ -17,8 +21,30 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 # HTTP Bearer认证
 token_bearer = HTTPBearer(auto_error=False)
 
+# 令牌缓存：sha256(token) -> UserResponse，避免每次请求都验证JWT并查询数据库
+_token_cache = TTLCache(maxsize=10_000, ttl=60)
 
-def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
+# JWT验证参数
+_JWT_KEY = settings.SECRET_KEY
+_JWT_ALGORITHMS = [settings.ALGORITHM]
+
+
+def _token_cache_key(token: str) -> bytes:
+    """计算令牌的缓存键"""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def looks_like_jwt(token: str) -> bool:
+    """判断凭证是否为JWT格式（header.payload.signature），API密钥不包含"." """
+    return token.count(".") == 2
+
+
+def invalidate_user_tokens(user_id: int) -> None:
+    """清除用户的令牌缓存"""
+    _token_cache.evict(lambda user: user.id == user_id)
+
+
+async def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
     """获取认证服务"""
     user_repository = UserRepository(db)
     return AuthService(user_repository)
@@ -38,30 +64,46 @@ async def get_current_user(
     if not credentials:
         raise credentials_exception
     
+    token = credentials.credentials
+    cache_key = _token_cache_key(token)
+    cached_user = _token_cache.get(cache_key)
+    if cached_user is not None:
+        return cached_user
+    
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
         user_id: int = payload.get("sub")
         if user_id is None:
             raise credentials_exception
         token_data = TokenData(user_id=user_id)
-    except JWTError:
+    except jwt.InvalidTokenError:
         raise credentials_exception
     
-    user = auth_service.get_user_by_id(token_data.user_id)
+    user = await run_in_threadpool(auth_service.get_user_by_id, token_data.user_id)
     if user is None:
         raise credentials_exception
     
-    return UserResponse(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        api_key=user.api_key,
-        created_at=user.created_at
-    )
+    user_response = UserResponse.model_validate(user)
+    
+    # 缓存到令牌过期为止（不超过缓存TTL）
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        _token_cache.set(cache_key, user_response, ttl=expires_in)
+    
+    return user_response
+
 
+async def get_current_user_from_token(
+    credentials: HTTPAuthorizationCredentials = Depends(token_bearer),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> Optional[UserResponse]:
+    """从JWT令牌获取当前用户，凭证不是JWT格式时返回None"""
+    if not credentials or not looks_like_jwt(credentials.credentials):
+        return None
+    return await get_current_user(credentials, auth_service)
 
-def get_current_active_user(current_user: UserResponse = Depends(get_current_user)) -> UserResponse:
+
+async def get_current_active_user(current_user: UserResponse = Depends(get_current_user)) -> UserResponse:
     """获取当前活跃用户"""
     return current_user
 
@@ -71,13 +113,7 @@ def register(user: UserCreate, auth_service: AuthService = Depends(get_auth_serv
     """注册新用户"""
     try:
         db_user = auth_service.register_user(user.username, user.email, user.password)
-        return UserResponse(
-            id=db_user.id,
-            username=db_user.username,
-            email=db_user.email,
-            api_key=db_user.api_key,
-            created_at=db_user.created_at
-        )
+        return db_user
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -144,10 +180,5 @@ def refresh_api_key(
 ):
     """刷新API密钥"""
     user = auth_service.refresh_api_key(current_user.id)
-    return UserResponse(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        api_key=user.api_key,
-        created_at=user.created_at
-    )
\ No newline at end of file
+    invalidate_user_tokens(user.id)
+    return user
\ No newline at end of file
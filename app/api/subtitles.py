@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional, List
+from urllib.parse import quote
 
 from app.config import settings
 from app.infrastructure.database.database import get_db
@@ -20,7 +21,18 @@ from app.api.tasks import get_current_user_from_api_key, get_current_user
 router = APIRouter(prefix="/subtitles", tags=["subtitles"])
 
 
-def get_subtitle_service(db: Session = Depends(get_db)) -> SubtitleService:
+def _content_disposition(filename: str) -> str:
+    """
+    构建附件下载的Content-Disposition头
+    
+    响应头只能使用latin-1编码，非ASCII文件名（如中文）通过RFC 5987的filename*参数传递，
+    filename参数保留ASCII回退值供旧客户端使用。
+    """
+    fallback = filename.encode("ascii", "replace").decode("ascii").replace('"', "_")
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+async def get_subtitle_service(db: Session = Depends(get_db)) -> SubtitleService:
     """获取字幕服务"""
     subtitle_repository = SubtitleRepository(db)
     task_repository = TaskRepository(db)
@@ -41,14 +53,7 @@ def get_subtitle(
             detail=f"Subtitle {subtitle_id} not found"
         )
     
-    return SubtitleDetailResponse(
-        id=subtitle.id,
-        task_id=subtitle.task_id,
-        format=subtitle.format,
-        content=subtitle.content,
-        created_at=subtitle.created_at,
-        updated_at=subtitle.updated_at
-    )
+    return subtitle
 
 
 @router.put("/{subtitle_id}", response_model=SubtitleDetailResponse)
@@ -63,14 +68,7 @@ def update_subtitle(
         subtitle = subtitle_service.update_subtitle(
             subtitle_id, subtitle_update.content, current_user.id
         )
-        return SubtitleDetailResponse(
-            id=subtitle.id,
-            task_id=subtitle.task_id,
-            format=subtitle.format,
-            content=subtitle.content,
-            created_at=subtitle.created_at,
-            updated_at=subtitle.updated_at
-        )
+        return subtitle
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -105,11 +103,12 @@ def download_subtitle(
     try:
         export_data = subtitle_service.export_subtitle(subtitle_id, current_user.id)
         
+        # 字幕内容存储在数据库中，查询后已完整位于内存，直接返回并由Response设置Content-Length
         return Response(
             content=export_data["content"],
             media_type=export_data["content_type"],
             headers={
-                "Content-Disposition": f"attachment; filename={export_data['filename']}"
+                "Content-Disposition": _content_disposition(export_data["filename"])
             }
         )
     except ValueError as e:
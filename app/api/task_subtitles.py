@@ -14,7 +14,7 @@ from app.api.tasks import get_current_user
 router = APIRouter(tags=["task-subtitles"])
 
 
-def get_subtitle_service(db: Session = Depends(get_db)) -> SubtitleService:
+async def get_subtitle_service(db: Session = Depends(get_db)) -> SubtitleService:
     """获取字幕服务"""
     subtitle_repository = SubtitleRepository(db)
     task_repository = TaskRepository(db)
@@ -28,15 +28,4 @@ def get_task_subtitles(
     subtitle_service: SubtitleService = Depends(get_subtitle_service)
 ):
     """获取任务的所有字幕"""
-    subtitles = subtitle_service.get_subtitles_by_task_id(task_id, current_user.id)
-    
-    return [
-        SubtitleResponse(
-            id=subtitle.id,
-            task_id=subtitle.task_id,
-            format=subtitle.format,
-            created_at=subtitle.created_at,
-            updated_at=subtitle.updated_at
-        )
-        for subtitle in subtitles
-    ]
\ No newline at end of file
+    return subtitle_service.get_subtitles_by_task_id(task_id, current_user.id)
\ No newline at end of file
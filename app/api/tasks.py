@@ -1,9 +1,11 @@
 import os
+import shutil
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, BinaryIO
 from pathlib import Path
 
 from app.config import settings
@@ -12,6 +14,7 @@ from app.infrastructure.database.repositories.task_repository import TaskReposit
 from app.infrastructure.database.repositories.user_repository import UserRepository
 from app.application.task_service import TaskService
 from app.application.auth_service import AuthService
+from app.api.auth import looks_like_jwt
 from app.schemas.task import (
     TaskCreate, TaskResponse, TaskListResponse, TaskStatusResponse,
     TaskPriorityUpdate, TaskCreateResponse, TaskStatus
@@ -24,8 +27,22 @@ router = APIRouter(prefix="/tasks", tags=["tasks"])
 # API密钥认证
 api_key_scheme = HTTPBearer(auto_error=False)
 
+# 上传文件分块写入的大小（1 MiB）
+UPLOAD_CHUNK_SIZE = 1 << 20
 
-def get_current_user_from_api_key(
+# 允许上传的文件类型
+_ALLOWED_EXTS = frozenset({".mp3", ".wav", ".m4a", ".flac", ".aac", ".ogg", ".mp4", ".avi", ".mov", ".mkv", ".wmv"})
+_ALLOWED_EXTS_MSG = ", ".join(sorted(_ALLOWED_EXTS))
+
+
+def _save_upload(src: BinaryIO, file_path: Path) -> None:
+    """将上传文件分块复制到磁盘（在线程池中执行）"""
+    src.seek(0)
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(src, buffer, length=UPLOAD_CHUNK_SIZE)
+
+
+async def get_current_user_from_api_key(
     credentials: HTTPAuthorizationCredentials = Depends(api_key_scheme),
     db: Session = Depends(get_db)
 ) -> Optional[UserResponse]:
@@ -34,28 +51,26 @@ def get_current_user_from_api_key(
         return None
     
     api_key = credentials.credentials
+    # JWT令牌由JWT认证处理，无需查询API密钥
+    if looks_like_jwt(api_key):
+        return None
+    
     user_repository = UserRepository(db)
     auth_service = AuthService(user_repository)
     
-    user = auth_service.get_user_by_api_key(api_key)
+    user = await run_in_threadpool(auth_service.get_user_by_api_key, api_key)
     if user:
-        return UserResponse(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            api_key=user.api_key,
-            created_at=user.created_at
-        )
+        return UserResponse.model_validate(user)
     return None
 
 
-def get_task_service(db: Session = Depends(get_db)) -> TaskService:
+async def get_task_service(db: Session = Depends(get_db)) -> TaskService:
     """获取任务服务"""
     task_repository = TaskRepository(db)
     return TaskService(task_repository)
 
 
-def get_current_user(
+async def get_current_user(
     current_user_from_api: Optional[UserResponse] = Depends(get_current_user_from_api_key),
     current_user_from_token: Optional[UserResponse] = Depends(lambda: None)  # 这个依赖会在主应用中被替换
 ) -> UserResponse:
@@ -81,12 +96,11 @@ async def create_task(
 ):
     """创建新的字幕生成任务"""
     # 验证文件类型
-    allowed_extensions = {".mp3", ".wav", ".m4a", ".flac", ".aac", ".ogg", ".mp4", ".avi", ".mov", ".mkv", ".wmv"}
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in allowed_extensions:
+    file_ext = Path(file.filename).suffix.lower()
+    if file_ext not in _ALLOWED_EXTS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}"
+            detail=f"Unsupported file type. Allowed types: {_ALLOWED_EXTS_MSG}"
         )
     
     # 创建上传目录
@@ -97,11 +111,9 @@ async def create_task(
     unique_filename = f"{uuid.uuid4()}{file_ext}"
     file_path = upload_dir / unique_filename
     
-    # 保存文件
+    # 保存文件（在线程池中写入，避免阻塞事件循环）
     try:
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await run_in_threadpool(_save_upload, file.file, file_path)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -119,17 +131,7 @@ async def create_task(
             priority=priority
         )
         
-        return TaskCreateResponse(
-            id=task.id,
-            user_id=task.user_id,
-            filename=task.filename,
-            language=task.language,
-            model=task.model,
-            status=task.status,
-            progress=task.progress,
-            priority=task.priority,
-            created_at=task.created_at
-        )
+        return task
     except ValueError as e:
         # 删除已上传的文件
         if os.path.exists(file_path):
@@ -158,34 +160,30 @@ def get_tasks(
 ):
     """获取用户的任务列表"""
     skip = (page - 1) * limit
-    tasks = task_service.get_tasks(current_user.id, status, skip, limit)
+    tasks = task_service.list_task_summaries(current_user.id, status, skip, limit)
     
     # 获取总数
-    total_tasks = len(task_service.get_tasks(current_user.id, status))
+    total_tasks = task_service.count_tasks(current_user.id, status)
     
     return TaskListResponse(
         total=total_tasks,
         page=page,
         limit=limit,
-        tasks=[
-            TaskResponse(
-                id=task.id,
-                user_id=task.user_id,
-                filename=task.filename,
-                language=task.language,
-                model=task.model,
-                status=task.status,
-                progress=task.progress,
-                priority=task.priority,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                completed_at=task.completed_at
-            )
-            for task in tasks
-        ]
+        tasks=tasks
     )
 
 
+@router.get("/statuses", response_model=List[TaskStatusResponse])
+def get_task_statuses(
+    ids: List[int] = Query(..., min_length=1, max_length=100),
+    current_user: UserResponse = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service)
+):
+    """批量获取任务状态"""
+    statuses = task_service.get_task_statuses(current_user.id, ids)
+    return list(statuses.values())
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 def get_task(
     task_id: int,
@@ -200,19 +198,7 @@ def get_task(
             detail=f"Task {task_id} not found"
         )
     
-    return TaskResponse(
-        id=task.id,
-        user_id=task.user_id,
-        filename=task.filename,
-        language=task.language,
-        model=task.model,
-        status=task.status,
-        progress=task.progress,
-        priority=task.priority,
-        created_at=task.created_at,
-        updated_at=task.updated_at,
-        completed_at=task.completed_at
-    )
+    return task
 
 
 @router.get("/{task_id}/status", response_model=TaskStatusResponse)
@@ -223,15 +209,7 @@ def get_task_status(
 ):
     """获取任务状态"""
     try:
-        status = task_service.get_task_status(task_id, current_user.id)
-        return TaskStatusResponse(
-            task_id=status["task_id"],
-            status=status["status"],
-            progress=status["progress"],
-            created_at=status["created_at"],
-            updated_at=status["updated_at"],
-            completed_at=status["completed_at"]
-        )
+        return task_service.get_task_status(task_id, current_user.id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -249,19 +227,7 @@ def update_task_priority(
     """更新任务优先级"""
     try:
         task = task_service.update_task_priority(task_id, current_user.id, priority_update.priority)
-        return TaskResponse(
-            id=task.id,
-            user_id=task.user_id,
-            filename=task.filename,
-            language=task.language,
-            model=task.model,
-            status=task.status,
-            progress=task.progress,
-            priority=task.priority,
-            created_at=task.created_at,
-            updated_at=task.updated_at,
-            completed_at=task.completed_at
-        )
+        return task
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -278,19 +244,7 @@ def cancel_task(
     """取消任务"""
     try:
         task = task_service.cancel_task(task_id, current_user.id)
-        return TaskResponse(
-            id=task.id,
-            user_id=task.user_id,
-            filename=task.filename,
-            language=task.language,
-            model=task.model,
-            status=task.status,
-            progress=task.progress,
-            priority=task.priority,
-            created_at=task.created_at,
-            updated_at=task.updated_at,
-            completed_at=task.completed_at
-        )
+        return task
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
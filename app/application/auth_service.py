@@ -1,11 +1,46 @@
+import hashlib
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
 from passlib.context import CryptContext
 from app.config import settings
 from app.domain.entities.user import User
 from app.domain.repositories.user_repository import UserRepositoryInterface
+from app.infrastructure.cache.ttl_cache import TTLCache
+
+# 密码哈希上下文，构建开销较大，全局共享
+# 新密码使用Argon2id（OWASP推荐参数），旧的bcrypt哈希仍可验证并在登录时迁移
+_PWD_CONTEXT = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+)
+
+# JWT签名参数
+_JWT_KEY = settings.SECRET_KEY
+_JWT_ALGORITHM = settings.ALGORITHM
+
+# sha256(API密钥) -> 用户缓存，AuthService按请求创建，因此缓存放在模块级别
+_api_key_cache = TTLCache(maxsize=10_000, ttl=300)
+
+# 用户ID -> 用户缓存，JWT认证未命中令牌缓存时按ID查询用户
+_user_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _hash_api_key(api_key: str) -> bytes:
+    """计算API密钥的摘要，用作缓存键，缓存键中不出现明文密钥（数据库中仍按明文密钥查询）"""
+    return hashlib.sha256(api_key.encode()).digest()
+
+
+def _invalidate_user(user_id: int, api_key: Optional[str]) -> None:
+    """用户信息变更后使相关缓存失效"""
+    _user_cache.pop(user_id)
+    if api_key:
+        _api_key_cache.pop(_hash_api_key(api_key))
 
 
 class AuthService:
@@ -13,7 +48,7 @@ class AuthService:
     
     def __init__(self, user_repository: UserRepositoryInterface):
         self.user_repository = user_repository
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.pwd_context = _PWD_CONTEXT
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """验证密码"""
@@ -31,7 +66,7 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHM)
         return encoded_jwt
     
     def create_api_key(self) -> str:
@@ -40,12 +75,11 @@ class AuthService:
     
     def register_user(self, username: str, email: str, password: str) -> User:
         """注册新用户"""
-        # 检查用户名是否已存在
-        if self.user_repository.get_by_username(username):
-            raise ValueError("Username already registered")
-        
-        # 检查邮箱是否已存在
-        if self.user_repository.get_by_email(email):
+        # 一次查询检查用户名和邮箱是否已存在
+        existing_user = self.user_repository.get_by_username_or_email(username, email)
+        if existing_user:
+            if existing_user.username == username:
+                raise ValueError("Username already registered")
             raise ValueError("Email already registered")
         
         # 创建新用户
@@ -66,17 +100,36 @@ class AuthService:
         user = self.user_repository.get_by_email(email)
         if not user:
             return None
-        if not self.verify_password(password, user.hashed_password):
+        verified, new_hash = self.pwd_context.verify_and_update(password, user.hashed_password)
+        if not verified:
             return None
+        
+        # 旧算法的哈希在验证成功后升级
+        if new_hash:
+            user.hashed_password = new_hash
+            user = self.user_repository.update(user)
+            _invalidate_user(user.id, user.api_key)
         return user
     
     def get_user_by_api_key(self, api_key: str) -> Optional[User]:
         """根据API密钥获取用户"""
-        return self.user_repository.get_by_api_key(api_key)
+        key_hash = _hash_api_key(api_key)
+        user = _api_key_cache.get(key_hash)
+        if user is None:
+            user = self.user_repository.get_by_api_key(api_key)
+            if not user:
+                return None
+            _api_key_cache.set(key_hash, user)
+        return user
     
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """根据ID获取用户"""
-        return self.user_repository.get_by_id(user_id)
+        user = _user_cache.get(user_id)
+        if user is None:
+            user = self.user_repository.get_by_id(user_id)
+            if user:
+                _user_cache.set(user_id, user)
+        return user
     
     def refresh_api_key(self, user_id: int) -> User:
         """刷新API密钥"""
@@ -84,5 +137,10 @@ class AuthService:
         if not user:
             raise ValueError("User not found")
         
+        old_api_key = user.api_key
         user.api_key = self.create_api_key()
-        return self.user_repository.update(user)
\ No newline at end of file
+        user = self.user_repository.update(user)
+        
+        # 使旧密钥和用户的缓存失效
+        _invalidate_user(user_id, old_api_key)
+        return user
\ No newline at end of file
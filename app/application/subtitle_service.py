@@ -1,9 +1,17 @@
+from types import MappingProxyType
 from typing import List, Optional, Dict, Any
 from app.domain.entities.subtitle import Subtitle
 from app.domain.entities.task import TaskStatus
 from app.domain.repositories.subtitle_repository import SubtitleRepositoryInterface
 from app.domain.repositories.task_repository import TaskRepositoryInterface
 
+# 字幕格式对应的Content-Type
+_CONTENT_TYPES = MappingProxyType({
+    "srt": "text/srt",
+    "vtt": "text/vtt",
+    "txt": "text/plain"
+})
+
 
 class SubtitleService:
     """字幕服务"""
@@ -27,13 +35,8 @@ class SubtitleService:
         Returns:
             字幕，如果不存在则返回None
         """
-        subtitle = self.subtitle_repository.get_by_id(subtitle_id)
-        if subtitle:
-            # 检查字幕所属的任务是否属于该用户
-            task = self.task_repository.get_by_id(subtitle.task_id)
-            if task and task.user_id == user_id:
-                return subtitle
-        return None
+        # 字幕与所属任务的用户校验在同一查询中完成
+        return self.subtitle_repository.get_by_id_for_user(subtitle_id, user_id)
     
     def get_subtitles_by_task_id(self, task_id: int, user_id: int) -> List[Subtitle]:
         """
@@ -46,17 +49,10 @@ class SubtitleService:
         Returns:
             字幕列表
         """
-        # 检查任务是否属于该用户
-        task = self.task_repository.get_by_id(task_id)
-        if not task or task.user_id != user_id:
-            return []
-        
-        # 检查任务是否已完成
-        if task.status != TaskStatus.COMPLETED:
-            return []
-        
-        # 获取字幕
-        return self.subtitle_repository.get_by_task_id(task_id)
+        # 任务归属和完成状态在同一查询中校验
+        return self.subtitle_repository.get_by_task_id_for_user(
+            task_id, user_id, task_status=TaskStatus.COMPLETED
+        )
     
     def get_subtitle_by_format(self, task_id: int, format: str, user_id: int) -> Optional[Subtitle]:
         """
@@ -70,17 +66,10 @@ class SubtitleService:
         Returns:
             字幕，如果不存在则返回None
         """
-        # 检查任务是否属于该用户
-        task = self.task_repository.get_by_id(task_id)
-        if not task or task.user_id != user_id:
-            return None
-        
-        # 检查任务是否已完成
-        if task.status != TaskStatus.COMPLETED:
-            return None
-        
-        # 获取字幕
-        return self.subtitle_repository.get_by_task_id_and_format(task_id, format)
+        # 任务归属和完成状态在同一查询中校验
+        return self.subtitle_repository.get_by_task_id_and_format_for_user(
+            task_id, format, user_id, task_status=TaskStatus.COMPLETED
+        )
     
     def update_subtitle(self, subtitle_id: int, content: str, user_id: int) -> Subtitle:
         """
@@ -140,17 +129,14 @@ class SubtitleService:
         Raises:
             ValueError: 如果字幕不存在或不属于该用户
         """
-        subtitle = self.get_subtitle(subtitle_id, user_id)
-        if not subtitle:
+        # 同时获取字幕和任务文件名
+        result = self.subtitle_repository.get_with_task_filename_for_user(subtitle_id, user_id)
+        if not result:
             raise ValueError(f"Subtitle not found: {subtitle_id}")
-        
-        # 获取任务信息
-        task = self.task_repository.get_by_id(subtitle.task_id)
-        if not task:
-            raise ValueError(f"Task not found for subtitle: {subtitle_id}")
+        subtitle, task_filename = result
         
         # 生成文件名
-        base_filename = task.filename.rsplit(".", 1)[0]
+        base_filename = task_filename.rsplit(".", 1)[0]
         filename = f"{base_filename}.{subtitle.format}"
         
         return {
@@ -160,7 +146,8 @@ class SubtitleService:
             "content_type": self._get_content_type(subtitle.format)
         }
     
-    def _get_content_type(self, format: str) -> str:
+    @staticmethod
+    def _get_content_type(format: str) -> str:
         """
         获取字幕格式对应的Content-Type
         
@@ -170,9 +157,4 @@ class SubtitleService:
         Returns:
             Content-Type
         """
-        content_types = {
-            "srt": "text/srt",
-            "vtt": "text/vtt",
-            "txt": "text/plain"
-        }
-        return content_types.get(format, "text/plain")
\ No newline at end of file
+        return _CONTENT_TYPES.get(format, "text/plain")
\ No newline at end of file
@@ -1,11 +1,33 @@
 import os
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from datetime import datetime
-from app.config import settings
-from app.domain.entities.task import Task, TaskStatus
+from app.config import get_settings
+from app.domain.entities.task import Task, TaskStatus, TaskSummary
 from app.domain.repositories.task_repository import TaskRepositoryInterface
-from app.infrastructure.celery.tasks.subtitle_tasks import generate_subtitles_task, cancel_task_task
+from app.infrastructure.cache.ttl_cache import TTLCache
+from app.infrastructure.celery.tasks.subtitle_tasks import (
+    generate_subtitles_task, cancel_task_task, generation_task_id
+)
+
+# Redis broker的最大优先级数值（0为最高优先级）
+REDIS_PRIO_MAX = 9
+
+# 可以更新优先级或取消的任务状态
+_ACTIVE_STATUSES = (TaskStatus.PENDING, TaskStatus.PROCESSING)
+
+# 任务状态缓存：task_id -> (user_id, 状态信息)，吸收客户端的高频轮询
+# Celery worker在独立进程中更新进度，其写入的可见延迟不超过TTL
+_status_cache = TTLCache(maxsize=10_000, ttl=1.0)
+
+# 批量状态缓存：(user_id, frozenset(task_ids)) -> {task_id: 状态信息}
+_statuses_cache = TTLCache(maxsize=1_000, ttl=15.0)
+
+
+def _invalidate_status(task_id: int) -> None:
+    """使任务的状态缓存失效"""
+    _status_cache.pop(task_id)
+    _statuses_cache.evict(lambda statuses: task_id in statuses)
 
 
 class TaskService:
@@ -37,14 +59,16 @@ class TaskService:
         Returns:
             创建的任务
         """
-        # 验证文件是否存在
-        if not os.path.exists(file_path):
+        # 验证文件是否存在（一次stat同时获取文件大小）
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
             raise ValueError(f"File not found: {file_path}")
         
         # 验证文件大小
-        file_size = os.path.getsize(file_path)
-        if file_size > settings.MAX_FILE_SIZE:
-            raise ValueError(f"File too large. Maximum size is {settings.MAX_FILE_SIZE} bytes")
+        max_file_size = get_settings().MAX_FILE_SIZE
+        if file_stat.st_size > max_file_size:
+            raise ValueError(f"File too large. Maximum size is {max_file_size} bytes")
         
         # 创建任务
         task = Task(
@@ -62,9 +86,12 @@ class TaskService:
         task = self.task_repository.create(task)
         
         # 发送任务到Celery队列
+        # 用户优先级越大越重要，而Redis broker中0为最高优先级，需要反转
+        broker_priority = max(0, min(REDIS_PRIO_MAX, REDIS_PRIO_MAX - priority))
         generate_subtitles_task.apply_async(
             args=[task.id],
-            priority=priority
+            task_id=generation_task_id(task.id),
+            priority=broker_priority
         )
         
         return task
@@ -109,6 +136,40 @@ class TaskService:
         else:
             return self.task_repository.get_by_user_id(user_id, skip, limit)
     
+    def list_task_summaries(
+        self, 
+        user_id: int, 
+        status: Optional[TaskStatus] = None, 
+        skip: int = 0, 
+        limit: int = 100
+    ) -> List[TaskSummary]:
+        """
+        获取用户的任务摘要列表，用于列表展示
+        
+        Args:
+            user_id: 用户ID
+            status: 任务状态过滤
+            skip: 跳过的任务数
+            limit: 返回的最大任务数
+        
+        Returns:
+            任务摘要列表
+        """
+        return self.task_repository.list_summaries_by_user(user_id, status, skip, limit)
+    
+    def count_tasks(self, user_id: int, status: Optional[TaskStatus] = None) -> int:
+        """
+        统计用户的任务数量
+        
+        Args:
+            user_id: 用户ID
+            status: 任务状态过滤
+        
+        Returns:
+            任务总数
+        """
+        return self.task_repository.count_by_user_id(user_id, status)
+    
     def update_task_priority(self, task_id: int, user_id: int, priority: int) -> Task:
         """
         更新任务优先级
@@ -124,19 +185,17 @@ class TaskService:
         Raises:
             ValueError: 如果任务不存在或不属于该用户
         """
-        task = self.get_task(task_id, user_id)
+        # 只有待处理或处理中的任务可以更新优先级，归属和状态校验在UPDATE条件中完成
+        task = self.task_repository.update_priority_for_user(
+            task_id, user_id, priority, _ACTIVE_STATUSES
+        )
+        _invalidate_status(task_id)
         if not task:
-            raise ValueError(f"Task not found: {task_id}")
-        
-        # 只有待处理或处理中的任务可以更新优先级
-        if task.status not in [TaskStatus.PENDING, TaskStatus.PROCESSING]:
-            raise ValueError(f"Cannot update priority for task in {task.status} status")
-        
-        # 更新优先级
-        self.task_repository.update_priority(task_id, priority)
-        
-        # 重新获取任务
-        task = self.task_repository.get_by_id(task_id)
+            # 仅在未更新时查询任务，区分任务不存在和状态不允许
+            current = self.get_task(task_id, user_id)
+            if not current:
+                raise ValueError(f"Task not found: {task_id}")
+            raise ValueError(f"Cannot update priority for task in {current.status} status")
         
         return task
     
@@ -154,22 +213,20 @@ class TaskService:
         Raises:
             ValueError: 如果任务不存在或不属于该用户
         """
-        task = self.get_task(task_id, user_id)
+        # 只有待处理或处理中的任务可以取消，归属和状态校验在UPDATE条件中完成
+        task = self.task_repository.update_status_for_user(
+            task_id, user_id, TaskStatus.CANCELED, _ACTIVE_STATUSES
+        )
+        _invalidate_status(task_id)
         if not task:
-            raise ValueError(f"Task not found: {task_id}")
+            # 仅在未更新时查询任务，区分任务不存在和状态不允许
+            current = self.get_task(task_id, user_id)
+            if not current:
+                raise ValueError(f"Task not found: {task_id}")
+            raise ValueError(f"Cannot cancel task in {current.status} status")
         
-        # 只有待处理或处理中的任务可以取消
-        if task.status not in [TaskStatus.PENDING, TaskStatus.PROCESSING]:
-            raise ValueError(f"Cannot cancel task in {task.status} status")
-        
-        # 发送取消任务到Celery队列
-        cancel_task_task.apply_async(args=[task_id])
-        
-        # 更新任务状态
-        self.task_repository.update_status(task_id, TaskStatus.CANCELED)
-        
-        # 重新获取任务
-        task = self.task_repository.get_by_id(task_id)
+        # 发送取消任务到Celery队列，由其通知正在运行的生成任务停止
+        cancel_task_task.apply_async(args=[task_id], queue="control", priority=0)
         
         return task
     
@@ -187,16 +244,19 @@ class TaskService:
         Raises:
             ValueError: 如果任务不存在或不属于该用户
         """
-        task = self.get_task(task_id, user_id)
+        # 删除任务（归属校验在同一查询中完成）
+        task = self.task_repository.delete_for_user(task_id, user_id)
+        _invalidate_status(task_id)
         if not task:
             raise ValueError(f"Task not found: {task_id}")
         
         # 删除任务文件
-        if os.path.exists(task.file_path):
+        try:
             os.remove(task.file_path)
+        except FileNotFoundError:
+            pass
         
-        # 删除任务
-        return self.task_repository.delete(task_id)
+        return True
     
     def get_task_status(self, task_id: int, user_id: int) -> Dict[str, Any]:
         """
@@ -209,15 +269,51 @@ class TaskService:
         Returns:
             任务状态信息
         """
+        cached = _status_cache.get(task_id)
+        if cached is not None and cached[0] == user_id:
+            return dict(cached[1])
+        
         task = self.get_task(task_id, user_id)
         if not task:
             raise ValueError(f"Task not found: {task_id}")
         
-        return {
+        task_status = {
             "task_id": task.id,
             "status": task.status.value,
             "progress": task.progress,
             "created_at": task.created_at,
             "updated_at": task.updated_at,
             "completed_at": task.completed_at
-        }
\ No newline at end of file
+        }
+        # 查询返回后再写入缓存，过期时间从此刻开始计算
+        _status_cache.set(task_id, (user_id, task_status))
+        return dict(task_status)
+    
+    def get_task_statuses(self, user_id: int, task_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        批量获取任务状态
+        
+        Args:
+            user_id: 用户ID
+            task_ids: 任务ID列表
+        
+        Returns:
+            任务ID到状态信息的映射，不存在或不属于该用户的任务不包含在内
+        """
+        cache_key = (user_id, frozenset(task_ids))
+        statuses = _statuses_cache.get(cache_key)
+        if statuses is None:
+            snapshots = self.task_repository.get_statuses_by_ids(user_id, list(cache_key[1]))
+            statuses = {
+                task_id: {
+                    "task_id": snapshot.task_id,
+                    "status": snapshot.status.value,
+                    "progress": snapshot.progress,
+                    "created_at": snapshot.created_at,
+                    "updated_at": snapshot.updated_at,
+                    "completed_at": snapshot.completed_at
+                }
+                for task_id, snapshot in snapshots.items()
+            }
+            _statuses_cache.set(cache_key, statuses)
+        return {task_id: dict(task_status) for task_id, task_status in statuses.items()}
\ No newline at end of file
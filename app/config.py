@@ -1,5 +1,6 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 import os
 from pathlib import Path
 
@@ -9,6 +10,8 @@ class Settings(BaseSettings):
     
     # 数据库配置
     DATABASE_URL: str = "sqlite:///./subtitles.db"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
     
     # Redis配置
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -25,6 +28,9 @@ class Settings(BaseSettings):
     # Whisper配置
     WHISPER_MODEL_PATH: str = "./models"
     WHISPER_MODEL: str = "base"
+    WHISPER_BATCH_SIZE: int = 16  # 批量解码的批大小，根据显存调整
+    WHISPER_COMPUTE_TYPE: str = "auto"  # 推理精度，auto表示GPU使用int8_float16、CPU使用int8
+    WHISPER_CPU_THREADS: int = 0  # 每个worker进程的CPU推理线程数，0表示使用CTranslate2默认值
     
     # 文件上传配置
     UPLOAD_DIR: str = "./uploads"
@@ -33,17 +39,33 @@ class Settings(BaseSettings):
     # API配置
     API_PREFIX: str = "/api"
     DEBUG: bool = True
+    WEB_WORKERS: int = 1  # uvicorn工作进程数，DEBUG模式下开启自动重载时只能使用单进程；进程内缓存不跨进程失效，多进程时失效前最多滞后一个TTL
+    
+    # CORS配置
+    CORS_ORIGINS: List[str] = ["http://localhost:3000"]  # 允许的来源列表，包含"*"时不允许携带凭证
+    CORS_ORIGIN_REGEX: Optional[str] = None
+    CORS_MAX_AGE: int = 86400  # 浏览器缓存预检请求结果的时间（秒）
     
     class Config:
         env_file = ".env"
         case_sensitive = True
-    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # 确保上传目录和模型目录存在
-        Path(self.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
-        Path(self.WHISPER_MODEL_PATH).mkdir(parents=True, exist_ok=True)
 
 
-# 创建全局配置实例
-settings = Settings()
\ No newline at end of file
+def _ensure_dir(path: str) -> None:
+    """确保目录存在"""
+    directory = Path(path)
+    if not directory.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """获取全局配置，首次调用时加载环境变量并创建上传目录和模型目录"""
+    settings = Settings()
+    _ensure_dir(settings.UPLOAD_DIR)
+    _ensure_dir(settings.WHISPER_MODEL_PATH)
+    return settings
+
+
+# 全局配置实例
+settings = get_settings()
\ No newline at end of file
@@ -0,0 +1,17 @@
+from typing import Type, TypeVar
+
+_E = TypeVar("_E")
+
+
+class FromDbMixin:
+    """为领域实体提供从数据库记录构建的快速构造方法"""
+    
+    __slots__ = ()
+    
+    @classmethod
+    def from_db(cls: Type[_E], **fields) -> _E:
+        """从数据库记录构建实体，跳过__post_init__验证（数据库中的数据已是有效的）"""
+        entity = object.__new__(cls)
+        for name, value in fields.items():
+            object.__setattr__(entity, name, value)
+        return entity
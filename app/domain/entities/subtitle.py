@@ -1,10 +1,11 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
+from app.domain.entities.base import FromDbMixin
 
 
-@dataclass
-class Subtitle:
+@dataclass(slots=True)
+class Subtitle(FromDbMixin):
     """字幕领域实体"""
     id: Optional[int] = None
     task_id: int = 0
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, List
 from enum import Enum
+from app.domain.entities.base import FromDbMixin
 
 
 class TaskStatus(str, Enum):
@@ -13,8 +14,35 @@ class TaskStatus(str, Enum):
     CANCELED = "canceled"
 
 
-@dataclass
-class Task:
+@dataclass(slots=True)
+class TaskStatusSnapshot:
+    """任务状态快照"""
+    task_id: int
+    status: TaskStatus
+    progress: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+
+@dataclass(slots=True)
+class TaskSummary:
+    """任务摘要，用于列表展示，不包含文件路径"""
+    id: int
+    user_id: int
+    filename: str
+    language: str
+    model: str
+    status: TaskStatus
+    progress: int
+    priority: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+
+@dataclass(slots=True)
+class Task(FromDbMixin):
     """任务领域实体"""
     id: Optional[int] = None
     user_id: int = 0
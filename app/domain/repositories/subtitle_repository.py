@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from app.domain.entities.subtitle import Subtitle
+from app.domain.entities.task import TaskStatus
 
 
 class SubtitleRepositoryInterface(ABC):
@@ -11,21 +12,48 @@ class SubtitleRepositoryInterface(ABC):
         """创建新字幕"""
         pass
     
+    @abstractmethod
+    def create_many(self, subtitles: List[Subtitle], commit: bool = True) -> List[Subtitle]:
+        """批量创建字幕"""
+        pass
+    
     @abstractmethod
     def get_by_id(self, subtitle_id: int) -> Optional[Subtitle]:
         """根据ID获取字幕"""
         pass
     
+    @abstractmethod
+    def get_by_id_for_user(self, subtitle_id: int, user_id: int) -> Optional[Subtitle]:
+        """根据ID获取属于指定用户的字幕"""
+        pass
+    
+    @abstractmethod
+    def get_with_task_filename_for_user(self, subtitle_id: int, user_id: int) -> Optional[Tuple[Subtitle, str]]:
+        """根据ID获取属于指定用户的字幕及其任务文件名"""
+        pass
+    
     @abstractmethod
     def get_by_task_id(self, task_id: int) -> List[Subtitle]:
         """根据任务ID获取字幕列表"""
         pass
     
+    @abstractmethod
+    def get_by_task_id_for_user(self, task_id: int, user_id: int, task_status: Optional[TaskStatus] = None) -> List[Subtitle]:
+        """根据任务ID获取属于指定用户的字幕列表"""
+        pass
+    
     @abstractmethod
     def get_by_task_id_and_format(self, task_id: int, format: str) -> Optional[Subtitle]:
         """根据任务ID和格式获取字幕"""
         pass
     
+    @abstractmethod
+    def get_by_task_id_and_format_for_user(
+        self, task_id: int, format: str, user_id: int, task_status: Optional[TaskStatus] = None
+    ) -> Optional[Subtitle]:
+        """根据任务ID和格式获取属于指定用户的字幕"""
+        pass
+    
     @abstractmethod
     def update(self, subtitle: Subtitle) -> Subtitle:
         """更新字幕信息"""
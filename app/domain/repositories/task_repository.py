@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
-from app.domain.entities.task import Task, TaskStatus
+from typing import Optional, List, Sequence, Dict
+from app.domain.entities.task import Task, TaskStatus, TaskStatusSnapshot, TaskSummary
 
 
 class TaskRepositoryInterface(ABC):
@@ -31,18 +31,41 @@ class TaskRepositoryInterface(ABC):
         """根据用户ID和状态获取任务列表"""
         pass
     
+    @abstractmethod
+    def list_summaries_by_user(
+        self, user_id: int, status: Optional[TaskStatus] = None, skip: int = 0, limit: int = 100
+    ) -> List[TaskSummary]:
+        """获取用户的任务摘要列表"""
+        pass
+    
+    @abstractmethod
+    def get_statuses_by_ids(self, user_id: int, task_ids: Sequence[int]) -> Dict[int, TaskStatusSnapshot]:
+        """批量获取用户任务的状态快照"""
+        pass
+    
+    @abstractmethod
+    def count_by_user_id(self, user_id: int, status: Optional[TaskStatus] = None) -> int:
+        """统计用户的任务数量"""
+        pass
+    
     @abstractmethod
     def update(self, task: Task) -> Task:
         """更新任务信息"""
         pass
     
     @abstractmethod
-    def update_status(self, task_id: int, status: TaskStatus) -> bool:
-        """更新任务状态"""
+    def update_status(
+        self,
+        task_id: int,
+        status: TaskStatus,
+        commit: bool = True,
+        excluded_statuses: Sequence[TaskStatus] = ()
+    ) -> bool:
+        """更新任务状态，任务当前处于excluded_statuses中的状态时不更新"""
         pass
     
     @abstractmethod
-    def update_progress(self, task_id: int, progress: int) -> bool:
+    def update_progress(self, task_id: int, progress: int, commit: bool = True) -> bool:
         """更新任务进度"""
         pass
     
@@ -51,7 +74,26 @@ class TaskRepositoryInterface(ABC):
         """更新任务优先级"""
         pass
     
+    @abstractmethod
+    def update_priority_for_user(
+        self, task_id: int, user_id: int, priority: int, statuses: Sequence[TaskStatus]
+    ) -> Optional[Task]:
+        """更新属于用户且处于指定状态的任务优先级，返回更新后的任务，未更新时返回None"""
+        pass
+    
+    @abstractmethod
+    def update_status_for_user(
+        self, task_id: int, user_id: int, status: TaskStatus, statuses: Sequence[TaskStatus]
+    ) -> Optional[Task]:
+        """更新属于用户且处于指定状态的任务状态，返回更新后的任务，未更新时返回None"""
+        pass
+    
     @abstractmethod
     def delete(self, task_id: int) -> bool:
         """删除任务"""
+        pass
+    
+    @abstractmethod
+    def delete_for_user(self, task_id: int, user_id: int) -> Optional[Task]:
+        """删除属于用户的任务，返回被删除的任务"""
         pass
\ No newline at end of file
@@ -26,6 +26,11 @@ class UserRepositoryInterface(ABC):
         """根据用户名获取用户"""
         pass
     
+    @abstractmethod
+    def get_by_username_or_email(self, username: str, email: str) -> Optional[User]:
+        """获取用户名或邮箱匹配的用户，用户名匹配优先"""
+        pass
+    
     @abstractmethod
     def get_by_api_key(self, api_key: str) -> Optional[User]:
         """根据API密钥获取用户"""
@@ -1,18 +1,19 @@
 from celery import Celery
 from app.config import settings
 
-# 创建Celery应用，暂时不使用结果后端
+# 创建Celery应用，结果后端用于AbortableTask的取消标记
 celery_app = Celery(
     "subtitle_api",
     broker=settings.CELERY_BROKER_URL,
-    backend=None
+    backend=settings.CELERY_RESULT_BACKEND
 )
 
 # 配置Celery
 celery_app.conf.update(
-    task_serializer="pickle",
-    accept_content=["pickle", "json"],
-    result_serializer="pickle",
+    # 任务参数和结果都是简单的ID和字典，使用JSON即可，避免pickle和压缩的开销
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
@@ -20,9 +21,17 @@ celery_app.conf.update(
     task_soft_time_limit=3000,  # 任务软超时时间（秒）
     worker_prefetch_multiplier=1,  # 每个worker每次获取的任务数
     worker_max_tasks_per_child=100,  # 每个worker进程最多处理的任务数，超过后会重启
-    # 配置结果序列化，确保异常能被正确处理
     result_extended=True,
-    result_compression="gzip",
+    # Redis broker需要显式开启优先级队列，0为最高优先级
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "queue_order_strategy": "priority",
+    },
+    # 取消等控制任务走独立队列，避免排在长时间运行的字幕生成任务之后
+    task_routes={
+        "app.infrastructure.celery.tasks.subtitle_tasks.generate_subtitles_task": {"queue": "generate"},
+        "app.infrastructure.celery.tasks.subtitle_tasks.cancel_task_task": {"queue": "control"},
+    },
 )
 
 # 自动发现任务
@@ -1,5 +1,8 @@
 import os
-import tempfile
+import time
+from celery.contrib.abortable import AbortableAsyncResult, AbortableTask
+from celery.signals import celeryd_after_setup, worker_process_init
+from celery.utils.log import get_task_logger
 from datetime import datetime
 from app.infrastructure.celery.celery_app import celery_app
 from app.infrastructure.database.database import SessionLocal
@@ -13,8 +16,50 @@ from app.config import settings
 # 导入所有模型，确保它们被SQLAlchemy注册
 from app.infrastructure.database.models import user, task, subtitle
 
+logger = get_task_logger(__name__)
 
-@celery_app.task(bind=True)
+# 进度写入数据库的节流条件：进度变化至少5%或距上次写入至少2秒
+PROGRESS_MIN_DELTA = 5
+PROGRESS_MIN_INTERVAL = 2.0
+
+
+# 已取消的任务不再被生成任务改写状态
+_CANCELED_STATUSES = (TaskStatus.CANCELED,)
+
+
+# 当前worker是否消费字幕生成队列，只有这类worker需要预加载模型
+_consumes_generate_queue = False
+
+
+@celeryd_after_setup.connect
+def _detect_generate_queue(sender, instance, **kwargs):
+    """在主进程中记录消费的队列，fork出的子进程会继承该标记"""
+    global _consumes_generate_queue
+    _consumes_generate_queue = "generate" in instance.app.amqp.queues.consume_from
+
+
+@worker_process_init.connect
+def _preload_whisper_model(**kwargs):
+    """在每个worker子进程启动时加载并预热默认Whisper模型，避免首个任务承担加载和冷启动耗时"""
+    if _consumes_generate_queue and not whisper_service.is_loaded(settings.WHISPER_MODEL):
+        try:
+            whisper_service.warmup(settings.WHISPER_MODEL)
+        except Exception as e:
+            # 预热失败不影响worker启动，首个任务会重新加载模型
+            logger.warning("Whisper warmup failed: %s", e)
+
+
+class TaskAbortedError(Exception):
+    """字幕生成任务被取消"""
+    pass
+
+
+def generation_task_id(task_id: int) -> str:
+    """生成字幕任务对应的Celery任务ID，取消时无需额外存储即可定位"""
+    return f"generate-subtitles-{task_id}"
+
+
+@celery_app.task(bind=True, base=AbortableTask)
 def generate_subtitles_task(self, task_id: int):
     """
     生成字幕的Celery任务
@@ -32,86 +77,71 @@ def generate_subtitles_task(self, task_id: int):
         # 获取任务
         task = task_repo.get_by_id(task_id)
         if not task:
-            task_repo.update_status(task_id, TaskStatus.FAILED)
             raise ValueError(f"Task {task_id} not found")
         
-        # 更新任务状态为处理中
-        task_repo.update_status(task_id, TaskStatus.PROCESSING)
+        # 排队期间已被取消的任务直接跳过
+        if task.status == TaskStatus.CANCELED or self.is_aborted():
+            return {"status": "canceled", "task_id": task_id}
+        
+        # 更新任务状态为处理中，读取任务后才被取消的不再覆盖为处理中
+        if not task_repo.update_status(
+            task_id, TaskStatus.PROCESSING, excluded_statuses=_CANCELED_STATUSES
+        ):
+            return {"status": "canceled", "task_id": task_id}
+        
+        # 上次写入数据库的进度和时间
+        last_written = [0, time.monotonic()]
         
         # 定义进度回调函数
         def progress_callback(progress: float):
-            """更新任务进度"""
+            """更新任务进度，取消检查、数据库和结果后端写入按进度变化和时间间隔节流"""
             progress_percent = int(progress * 100)
+            now = time.monotonic()
+            if (progress_percent - last_written[0] < PROGRESS_MIN_DELTA
+                    and now - last_written[1] < PROGRESS_MIN_INTERVAL):
+                return
+            # 协作式取消：不使用revoke(terminate=True)强杀worker进程
+            # 必须在写入PROGRESS之前检查，否则PROGRESS会覆盖结果后端中的ABORTED状态
+            if self.is_aborted():
+                raise TaskAbortedError(f"Task {task_id} canceled")
             task_repo.update_progress(task_id, progress_percent)
             self.update_state(state="PROGRESS", meta={"progress": progress_percent})
+            last_written[0] = progress_percent
+            last_written[1] = now
         
         # 检查文件是否存在
         if not os.path.exists(task.file_path):
-            task_repo.update_status(task_id, TaskStatus.FAILED)
             raise ValueError(f"File {task.file_path} not found")
         
-        # 检查文件类型
-        file_ext = os.path.splitext(task.file_path)[1].lower()
-        audio_path = task.file_path
+        # 音视频文件统一由ffmpeg解码为内存中的采样，不再生成临时音频文件
+        audio = whisper_service.load_audio(task.file_path)
         
-        # 如果是视频文件，提取音频
-        if file_ext in [".mp4", ".avi", ".mov", ".mkv", ".wmv"]:
-            # 创建临时音频文件
-            temp_audio_fd, temp_audio_path = tempfile.mkstemp(suffix=".wav")
-            os.close(temp_audio_fd)
-            
-            try:
-                # 提取音频
-                if not whisper_service.extract_audio(task.file_path, temp_audio_path):
-                    task_repo.update_status(task_id, TaskStatus.FAILED)
-                    raise ValueError("Failed to extract audio from video")
-                
-                audio_path = temp_audio_path
-                
-                # 生成字幕
-                subtitles = whisper_service.generate_subtitles(
-                    audio_path,
-                    model_name=task.model,
-                    language=task.language,
-                    formats=["srt", "vtt", "txt"],
-                    progress_callback=progress_callback
-                )
-                
-                # 保存字幕
-                for format, content in subtitles.items():
-                    subtitle = subtitle_repo.create(
-                        Subtitle(
-                            task_id=task_id,
-                            format=format,
-                            content=content
-                        )
-                    )
-            finally:
-                # 清理临时文件
-                if os.path.exists(temp_audio_path):
-                    os.remove(temp_audio_path)
-        else:
-            # 直接处理音频文件
-            subtitles = whisper_service.generate_subtitles(
-                audio_path,
-                model_name=task.model,
-                language=task.language,
-                formats=["srt", "vtt", "txt"],
-                progress_callback=progress_callback
-            )
-            
-            # 保存字幕
-            for format, content in subtitles.items():
-                subtitle = subtitle_repo.create(
-                    Subtitle(
-                        task_id=task_id,
-                        format=format,
-                        content=content
-                    )
-                )
+        # 生成字幕
+        subtitles = whisper_service.generate_subtitles(
+            audio,
+            model_name=task.model,
+            language=task.language,
+            formats=["srt", "vtt", "txt"],
+            progress_callback=progress_callback
+        )
         
-        # 更新任务状态为完成
-        task_repo.update_status(task_id, TaskStatus.COMPLETED)
+        # 保存字幕并更新任务状态为完成，在同一个事务中提交
+        subtitle_repo.create_many([
+            Subtitle(
+                task_id=task_id,
+                format=format,
+                content=content
+            )
+            for format, content in subtitles.items()
+        ], commit=False)
+        task_repo.update_progress(task_id, 100, commit=False)
+        if not task_repo.update_status(
+            task_id, TaskStatus.COMPLETED, commit=False, excluded_statuses=_CANCELED_STATUSES
+        ):
+            # 转录期间已被取消：丢弃字幕，保持已取消状态
+            db.rollback()
+            return {"status": "canceled", "task_id": task_id}
+        db.commit()
         
         return {
             "status": "success",
@@ -119,9 +149,14 @@ def generate_subtitles_task(self, task_id: int):
             "subtitles": list(subtitles.keys())
         }
     
+    except TaskAbortedError:
+        # 任务状态已由取消操作更新为已取消
+        return {"status": "canceled", "task_id": task_id}
+    
     except Exception as e:
-        # 更新任务状态为失败
-        task_repo.update_status(task_id, TaskStatus.FAILED)
+        # 回滚未提交的字幕写入，再更新任务状态为失败
+        db.rollback()
+        task_repo.update_status(task_id, TaskStatus.FAILED, excluded_statuses=_CANCELED_STATUSES)
         self.update_state(state="FAILURE", meta={"error": str(e)})
         # 重新抛出异常，让Celery能够正确处理失败信息
         raise
@@ -149,12 +184,16 @@ def cancel_task_task(self, task_id: int):
         if not task:
             raise ValueError(f"Task {task_id} not found")
         
-        # 检查任务状态
-        if task.status not in [TaskStatus.PENDING, TaskStatus.PROCESSING]:
+        # 检查任务状态（API可能已将任务标记为已取消）
+        if task.status not in [TaskStatus.PENDING, TaskStatus.PROCESSING, TaskStatus.CANCELED]:
             raise ValueError(f"Task {task_id} cannot be canceled")
         
         # 更新任务状态为已取消
-        task_repo.update_status(task_id, TaskStatus.CANCELED)
+        if task.status != TaskStatus.CANCELED:
+            task_repo.update_status(task_id, TaskStatus.CANCELED)
+        
+        # 通知正在运行的字幕生成任务停止
+        AbortableAsyncResult(generation_task_id(task_id), app=celery_app).abort()
         
         return {"status": "success", "task_id": task_id}
     
@@ -4,10 +4,21 @@ from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
 
+def _engine_options(database_url: str) -> dict:
+    """根据数据库类型生成引擎参数"""
+    if database_url.startswith("sqlite"):
+        # SQLite连接可能在线程池中的不同线程上使用
+        return {"connect_args": {"check_same_thread": False}}
+    # 其他数据库使用连接池，避免并发请求时连接耗尽
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": False,
+    }
+
+
 # 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -18,7 +29,7 @@ Base = declarative_base()
 
 # 依赖注入函数，用于获取数据库会话
 def get_db():
-    """获取数据库会话的依赖注入函数"""
+    """获取数据库会话的依赖注入函数，同一请求内的依赖共享该会话"""
     db = SessionLocal()
     try:
         yield db
@@ -30,5 +41,7 @@ def init_db():
     """初始化数据库，创建所有表"""
     # 导入所有模型，确保它们被注册
     from app.infrastructure.database.models import user, task, subtitle
+    from app.infrastructure.database.indexes import create_indexes
     
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    create_indexes(engine)
\ No newline at end of file
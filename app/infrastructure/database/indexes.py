@@ -0,0 +1,55 @@
+from sqlalchemy import Index, inspect
+from sqlalchemy.engine import Engine
+
+from app.infrastructure.database.models.user import User as UserModel
+from app.infrastructure.database.models.task import Task as TaskModel
+from app.infrastructure.database.models.subtitle import Subtitle as SubtitleModel
+
+# UserRepository按字段查找用户的列：get_by_api_key、get_by_email、get_by_username
+# 索引在启动时按需创建，不声明在表上，避免与模型中Column(index=True)生成的索引重复
+USER_LOOKUP_COLUMNS = ("api_key", "email", "username")
+
+# 与TaskRepository查询条件和排序匹配的复合索引
+TASK_INDEXES = (
+    # get_by_user_id / count_by_user_id
+    Index("ix_task_user_created", TaskModel.user_id, TaskModel.created_at),
+    # get_by_user_id_and_status
+    Index("ix_task_user_status_created", TaskModel.user_id, TaskModel.status, TaskModel.created_at),
+    # get_by_status
+    Index("ix_task_status_prio_created", TaskModel.status, TaskModel.priority, TaskModel.created_at),
+)
+
+# 与SubtitleRepository查询条件匹配的复合索引
+SUBTITLE_INDEXES = (
+    # get_by_task_id
+    Index("ix_subtitle_task_created", SubtitleModel.task_id, SubtitleModel.created_at),
+    # get_by_task_id_and_format
+    Index("ix_subtitle_task_format", SubtitleModel.task_id, SubtitleModel.format),
+)
+
+
+def _create_user_indexes(engine: Engine) -> None:
+    """
+    为尚未建立索引的用户查找列补建普通索引
+
+    已作为某个索引或唯一约束首列的列直接跳过。索引不带唯一约束，
+    已存在重复数据的数据库也能正常启动；唯一性需在清理重复数据后通过单独的迁移添加。
+    """
+    table = UserModel.__table__
+    inspector = inspect(engine)
+    indexed = {
+        index["column_names"][0]
+        for index in inspector.get_indexes(table.name) + inspector.get_unique_constraints(table.name)
+        if index["column_names"]
+    }
+    for name in USER_LOOKUP_COLUMNS:
+        if name not in indexed:
+            # 与Column(index=True)的命名一致，模型日后声明索引时不会重复创建
+            Index(f"ix_{table.name}_{name}", table.c[name]).create(bind=engine, checkfirst=True)
+
+
+def create_indexes(engine: Engine) -> None:
+    """为已存在的表补建索引，新建表时索引由create_all一并创建"""
+    for index in TASK_INDEXES + SUBTITLE_INDEXES:
+        index.create(bind=engine, checkfirst=True)
+    _create_user_indexes(engine)
@@ -0,0 +1,59 @@
+from typing import Any, Dict, Optional, Sequence
+from sqlalchemy import Table, select, update
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import Session
+
+from app.infrastructure.database.models.task import Task as TaskModel
+from app.infrastructure.database.models.subtitle import Subtitle as SubtitleModel
+
+
+def delete_tasks(db: Session, *criteria) -> int:
+    """
+    批量删除满足条件的任务及其字幕，由调用方提交事务
+    
+    批量删除不经过ORM级联，先用子查询显式删除关联字幕，再删除任务。
+    
+    Args:
+        db: 数据库会话
+        criteria: 任务表上的过滤条件
+    
+    Returns:
+        删除的任务数
+    """
+    task_ids = select(TaskModel.id).where(*criteria)
+    db.query(SubtitleModel).filter(SubtitleModel.task_id.in_(task_ids)).delete(synchronize_session=False)
+    return db.query(TaskModel).filter(*criteria).delete(synchronize_session=False)
+
+
+def update_returning(
+    db: Session,
+    table: Table,
+    key_criterion,
+    values: Dict[str, Any],
+    columns: Sequence,
+    *criteria
+) -> Optional[RowMapping]:
+    """
+    按主键条件（及附加条件）更新一行，返回更新后的列值，由调用方提交事务
+    
+    支持RETURNING的数据库（SQLite 3.35+、PostgreSQL）一条语句完成更新并返回新值；
+    其他数据库先执行UPDATE，更新成功后再按主键条件查询。附加条件可能引用被更新的列，
+    因此回查只使用主键条件。
+    
+    Args:
+        db: 数据库会话
+        table: 要更新的表
+        key_criterion: 主键条件
+        values: 列名到新值的映射
+        columns: 返回的列
+        criteria: 附加的更新条件
+    
+    Returns:
+        更新后的列值，没有满足条件的行时返回None
+    """
+    stmt = update(table).where(key_criterion, *criteria).values(values)
+    if db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(*columns)).mappings().first()
+    if not db.execute(stmt).rowcount:
+        return None
+    return db.execute(select(*columns).where(key_criterion)).mappings().first()
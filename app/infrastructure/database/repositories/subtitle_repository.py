@@ -1,8 +1,10 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
 from app.domain.entities.subtitle import Subtitle
+from app.domain.entities.task import TaskStatus
 from app.domain.repositories.subtitle_repository import SubtitleRepositoryInterface
 from app.infrastructure.database.models.subtitle import Subtitle as SubtitleModel
+from app.infrastructure.database.models.task import Task as TaskModel
 
 
 class SubtitleRepository(SubtitleRepositoryInterface):
@@ -23,6 +25,25 @@ class SubtitleRepository(SubtitleRepositoryInterface):
         self.db.refresh(db_subtitle)
         return self._map_to_entity(db_subtitle)
     
+    def create_many(self, subtitles: List[Subtitle], commit: bool = True) -> List[Subtitle]:
+        """批量创建字幕，在一个事务中提交；commit为False时只flush，由调用方提交事务"""
+        db_subtitles = [
+            SubtitleModel(
+                task_id=subtitle.task_id,
+                format=subtitle.format,
+                content=subtitle.content
+            )
+            for subtitle in subtitles
+        ]
+        self.db.add_all(db_subtitles)
+        if not commit:
+            self.db.flush()
+            return [self._map_to_entity(db_subtitle) for db_subtitle in db_subtitles]
+        self.db.commit()
+        for db_subtitle in db_subtitles:
+            self.db.refresh(db_subtitle)
+        return [self._map_to_entity(db_subtitle) for db_subtitle in db_subtitles]
+    
     def get_by_id(self, subtitle_id: int) -> Optional[Subtitle]:
         """根据ID获取字幕"""
         db_subtitle = self.db.query(SubtitleModel).filter(SubtitleModel.id == subtitle_id).first()
@@ -30,6 +51,31 @@ class SubtitleRepository(SubtitleRepositoryInterface):
             return self._map_to_entity(db_subtitle)
         return None
     
+    def get_by_id_for_user(self, subtitle_id: int, user_id: int) -> Optional[Subtitle]:
+        """根据ID获取属于指定用户的字幕"""
+        db_subtitle = self.db.query(SubtitleModel).join(
+            TaskModel, TaskModel.id == SubtitleModel.task_id
+        ).filter(
+            SubtitleModel.id == subtitle_id,
+            TaskModel.user_id == user_id
+        ).first()
+        if db_subtitle:
+            return self._map_to_entity(db_subtitle)
+        return None
+    
+    def get_with_task_filename_for_user(self, subtitle_id: int, user_id: int) -> Optional[Tuple[Subtitle, str]]:
+        """根据ID获取属于指定用户的字幕及其任务文件名"""
+        row = self.db.query(SubtitleModel, TaskModel.filename).join(
+            TaskModel, TaskModel.id == SubtitleModel.task_id
+        ).filter(
+            SubtitleModel.id == subtitle_id,
+            TaskModel.user_id == user_id
+        ).first()
+        if row:
+            db_subtitle, filename = row
+            return self._map_to_entity(db_subtitle), filename
+        return None
+    
     def get_by_task_id(self, task_id: int) -> List[Subtitle]:
         """根据任务ID获取字幕列表"""
         db_subtitles = self.db.query(SubtitleModel).filter(
@@ -39,6 +85,15 @@ class SubtitleRepository(SubtitleRepositoryInterface):
         ).all()
         return [self._map_to_entity(db_subtitle) for db_subtitle in db_subtitles]
     
+    def get_by_task_id_for_user(self, task_id: int, user_id: int, task_status: Optional[TaskStatus] = None) -> List[Subtitle]:
+        """根据任务ID获取属于指定用户的字幕列表"""
+        query = self._query_for_user(user_id, task_status).filter(
+            SubtitleModel.task_id == task_id
+        ).order_by(
+            SubtitleModel.created_at.desc()
+        )
+        return [self._map_to_entity(db_subtitle) for db_subtitle in query.all()]
+    
     def get_by_task_id_and_format(self, task_id: int, format: str) -> Optional[Subtitle]:
         """根据任务ID和格式获取字幕"""
         db_subtitle = self.db.query(SubtitleModel).filter(
@@ -49,6 +104,18 @@ class SubtitleRepository(SubtitleRepositoryInterface):
             return self._map_to_entity(db_subtitle)
         return None
     
+    def get_by_task_id_and_format_for_user(
+        self, task_id: int, format: str, user_id: int, task_status: Optional[TaskStatus] = None
+    ) -> Optional[Subtitle]:
+        """根据任务ID和格式获取属于指定用户的字幕"""
+        db_subtitle = self._query_for_user(user_id, task_status).filter(
+            SubtitleModel.task_id == task_id,
+            SubtitleModel.format == format
+        ).first()
+        if db_subtitle:
+            return self._map_to_entity(db_subtitle)
+        return None
+    
     def update(self, subtitle: Subtitle) -> Subtitle:
         """更新字幕信息"""
         db_subtitle = self.db.query(SubtitleModel).filter(SubtitleModel.id == subtitle.id).first()
@@ -62,16 +129,24 @@ class SubtitleRepository(SubtitleRepositoryInterface):
     
     def delete(self, subtitle_id: int) -> bool:
         """删除字幕"""
-        db_subtitle = self.db.query(SubtitleModel).filter(SubtitleModel.id == subtitle_id).first()
-        if db_subtitle:
-            self.db.delete(db_subtitle)
-            self.db.commit()
-            return True
-        return False
+        rowcount = self.db.query(SubtitleModel).filter(SubtitleModel.id == subtitle_id).delete(
+            synchronize_session=False
+        )
+        self.db.commit()
+        return rowcount > 0
+    
+    def _query_for_user(self, user_id: int, task_status: Optional[TaskStatus] = None):
+        """构建关联任务并按用户（及任务状态）过滤的字幕查询"""
+        query = self.db.query(SubtitleModel).join(
+            TaskModel, TaskModel.id == SubtitleModel.task_id
+        ).filter(TaskModel.user_id == user_id)
+        if task_status:
+            query = query.filter(TaskModel.status == task_status.value)
+        return query
     
     def _map_to_entity(self, db_subtitle: SubtitleModel) -> Subtitle:
         """将数据库模型映射到领域实体"""
-        return Subtitle(
+        return Subtitle.from_db(
             id=db_subtitle.id,
             task_id=db_subtitle.task_id,
             format=db_subtitle.format,
@@ -1,8 +1,32 @@
-from typing import Optional, List
+from dataclasses import fields
+from typing import Any, Optional, List, Sequence, Dict
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from app.domain.entities.task import Task, TaskStatus
+from app.domain.entities.task import Task, TaskStatus, TaskStatusSnapshot, TaskSummary
 from app.domain.repositories.task_repository import TaskRepositoryInterface
 from app.infrastructure.database.models.task import Task as TaskModel
+from app.infrastructure.database.operations import delete_tasks, update_returning
+
+# 只读列表查询直接使用Core表对象，绕过ORM实例化和标识映射
+_TASK_TABLE = TaskModel.__table__
+
+# 与任务实体字段一一对应的列，表新增列时不会传入Task.from_db
+_TASK_COLUMNS = tuple(_TASK_TABLE.c[field.name] for field in fields(Task))
+
+# 任务摘要查询的列，不包含文件路径
+_SUMMARY_COLUMNS = (
+    TaskModel.id,
+    TaskModel.user_id,
+    TaskModel.filename,
+    TaskModel.language,
+    TaskModel.model,
+    TaskModel.status,
+    TaskModel.progress,
+    TaskModel.priority,
+    TaskModel.created_at,
+    TaskModel.updated_at,
+    TaskModel.completed_at,
+)
 
 
 class TaskRepository(TaskRepositoryInterface):
@@ -37,32 +61,91 @@ class TaskRepository(TaskRepositoryInterface):
     
     def get_by_user_id(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Task]:
         """获取用户的任务列表"""
-        db_tasks = self.db.query(TaskModel).filter(
-            TaskModel.user_id == user_id
+        stmt = select(*_TASK_COLUMNS).where(
+            _TASK_TABLE.c.user_id == user_id
         ).order_by(
-            TaskModel.created_at.desc()
-        ).offset(skip).limit(limit).all()
-        return [self._map_to_entity(db_task) for db_task in db_tasks]
+            _TASK_TABLE.c.created_at.desc()
+        ).offset(skip).limit(limit)
+        return self._fetch_entities(stmt)
     
     def get_by_status(self, status: TaskStatus, skip: int = 0, limit: int = 100) -> List[Task]:
         """根据状态获取任务列表"""
-        db_tasks = self.db.query(TaskModel).filter(
-            TaskModel.status == status.value
+        stmt = select(*_TASK_COLUMNS).where(
+            _TASK_TABLE.c.status == status.value
         ).order_by(
-            TaskModel.priority.desc(),
-            TaskModel.created_at.desc()
-        ).offset(skip).limit(limit).all()
-        return [self._map_to_entity(db_task) for db_task in db_tasks]
+            _TASK_TABLE.c.priority.desc(),
+            _TASK_TABLE.c.created_at.desc()
+        ).offset(skip).limit(limit)
+        return self._fetch_entities(stmt)
     
     def get_by_user_id_and_status(self, user_id: int, status: TaskStatus, skip: int = 0, limit: int = 100) -> List[Task]:
         """根据用户ID和状态获取任务列表"""
-        db_tasks = self.db.query(TaskModel).filter(
-            TaskModel.user_id == user_id,
-            TaskModel.status == status.value
+        stmt = select(*_TASK_COLUMNS).where(
+            _TASK_TABLE.c.user_id == user_id,
+            _TASK_TABLE.c.status == status.value
         ).order_by(
-            TaskModel.created_at.desc()
-        ).offset(skip).limit(limit).all()
-        return [self._map_to_entity(db_task) for db_task in db_tasks]
+            _TASK_TABLE.c.created_at.desc()
+        ).offset(skip).limit(limit)
+        return self._fetch_entities(stmt)
+    
+    def list_summaries_by_user(
+        self, user_id: int, status: Optional[TaskStatus] = None, skip: int = 0, limit: int = 100
+    ) -> List[TaskSummary]:
+        """获取用户的任务摘要列表，只查询列表展示需要的列"""
+        stmt = select(*_SUMMARY_COLUMNS).where(TaskModel.user_id == user_id)
+        if status:
+            stmt = stmt.where(TaskModel.status == status.value)
+        stmt = stmt.order_by(TaskModel.created_at.desc()).offset(skip).limit(limit)
+        return [
+            TaskSummary(
+                id=row.id,
+                user_id=row.user_id,
+                filename=row.filename,
+                language=row.language,
+                model=row.model,
+                status=TaskStatus(row.status),
+                progress=row.progress,
+                priority=row.priority,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                completed_at=row.completed_at
+            )
+            for row in self.db.execute(stmt)
+        ]
+    
+    def get_statuses_by_ids(self, user_id: int, task_ids: Sequence[int]) -> Dict[int, TaskStatusSnapshot]:
+        """批量获取用户任务的状态快照，只查询状态相关的列"""
+        if not task_ids:
+            return {}
+        rows = self.db.query(
+            TaskModel.id,
+            TaskModel.status,
+            TaskModel.progress,
+            TaskModel.created_at,
+            TaskModel.updated_at,
+            TaskModel.completed_at
+        ).filter(
+            TaskModel.user_id == user_id,
+            TaskModel.id.in_(task_ids)
+        ).all()
+        return {
+            row.id: TaskStatusSnapshot(
+                task_id=row.id,
+                status=TaskStatus(row.status),
+                progress=row.progress,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                completed_at=row.completed_at
+            )
+            for row in rows
+        }
+    
+    def count_by_user_id(self, user_id: int, status: Optional[TaskStatus] = None) -> int:
+        """统计用户的任务数量"""
+        query = self.db.query(func.count(TaskModel.id)).filter(TaskModel.user_id == user_id)
+        if status:
+            query = query.filter(TaskModel.status == status.value)
+        return query.scalar()
     
     def update(self, task: Task) -> Task:
         """更新任务信息"""
@@ -82,48 +165,119 @@ class TaskRepository(TaskRepositoryInterface):
             return self._map_to_entity(db_task)
         raise ValueError(f"Task with id {task.id} not found")
     
-    def update_status(self, task_id: int, status: TaskStatus) -> bool:
-        """更新任务状态"""
-        db_task = self.db.query(TaskModel).filter(TaskModel.id == task_id).first()
-        if db_task:
-            db_task.status = status.value
-            if status == TaskStatus.COMPLETED:
-                from datetime import datetime
-                db_task.completed_at = datetime.utcnow()
+    def update_status(
+        self,
+        task_id: int,
+        status: TaskStatus,
+        commit: bool = True,
+        excluded_statuses: Sequence[TaskStatus] = ()
+    ) -> bool:
+        """
+        更新任务状态，commit为False时由调用方提交事务
+        
+        任务当前处于excluded_statuses中的状态时不更新（条件在UPDATE中完成），返回False
+        """
+        values = {TaskModel.status: status.value}
+        if status == TaskStatus.COMPLETED:
+            from datetime import datetime
+            values[TaskModel.completed_at] = datetime.utcnow()
+        query = self.db.query(TaskModel).filter(TaskModel.id == task_id)
+        if excluded_statuses:
+            query = query.filter(TaskModel.status.notin_([status.value for status in excluded_statuses]))
+        rowcount = query.update(values, synchronize_session=False)
+        if commit:
             self.db.commit()
-            return True
-        return False
+        return rowcount > 0
     
-    def update_progress(self, task_id: int, progress: int) -> bool:
-        """更新任务进度"""
-        db_task = self.db.query(TaskModel).filter(TaskModel.id == task_id).first()
-        if db_task:
-            db_task.progress = progress
+    def update_progress(self, task_id: int, progress: int, commit: bool = True) -> bool:
+        """更新任务进度，commit为False时由调用方提交事务"""
+        rowcount = self.db.query(TaskModel).filter(TaskModel.id == task_id).update(
+            {TaskModel.progress: progress}, synchronize_session=False
+        )
+        if commit:
             self.db.commit()
-            return True
-        return False
+        return rowcount > 0
     
     def update_priority(self, task_id: int, priority: int) -> bool:
         """更新任务优先级"""
-        db_task = self.db.query(TaskModel).filter(TaskModel.id == task_id).first()
-        if db_task:
-            db_task.priority = priority
-            self.db.commit()
-            return True
-        return False
+        rowcount = self.db.query(TaskModel).filter(TaskModel.id == task_id).update(
+            {TaskModel.priority: priority}, synchronize_session=False
+        )
+        self.db.commit()
+        return rowcount > 0
+    
+    def update_priority_for_user(
+        self, task_id: int, user_id: int, priority: int, statuses: Sequence[TaskStatus]
+    ) -> Optional[Task]:
+        """更新属于用户且处于指定状态的任务优先级，返回更新后的任务，未更新时返回None"""
+        return self._update_for_user(task_id, user_id, statuses, {"priority": priority})
+    
+    def update_status_for_user(
+        self, task_id: int, user_id: int, status: TaskStatus, statuses: Sequence[TaskStatus]
+    ) -> Optional[Task]:
+        """更新属于用户且处于指定状态的任务状态，返回更新后的任务，未更新时返回None"""
+        values = {"status": status.value}
+        if status == TaskStatus.COMPLETED:
+            from datetime import datetime
+            values["completed_at"] = datetime.utcnow()
+        return self._update_for_user(task_id, user_id, statuses, values)
     
     def delete(self, task_id: int) -> bool:
-        """删除任务"""
-        db_task = self.db.query(TaskModel).filter(TaskModel.id == task_id).first()
+        """删除任务及其字幕"""
+        rowcount = delete_tasks(self.db, TaskModel.id == task_id)
+        self.db.commit()
+        return rowcount > 0
+    
+    def delete_for_user(self, task_id: int, user_id: int) -> Optional[Task]:
+        """删除属于用户的任务，返回被删除的任务"""
+        db_task = self._query_for_user(task_id, user_id).first()
         if db_task:
+            task = self._map_to_entity(db_task)
             self.db.delete(db_task)
             self.db.commit()
-            return True
-        return False
+            return task
+        return None
+    
+    def _update_for_user(
+        self, task_id: int, user_id: int, statuses: Sequence[TaskStatus], values: Dict[str, Any]
+    ) -> Optional[Task]:
+        """按任务ID、用户ID和状态条件更新任务，返回更新后的任务"""
+        row = update_returning(
+            self.db,
+            _TASK_TABLE,
+            _TASK_TABLE.c.id == task_id,
+            values,
+            _TASK_COLUMNS,
+            _TASK_TABLE.c.user_id == user_id,
+            _TASK_TABLE.c.status.in_([status.value for status in statuses])
+        )
+        self.db.commit()
+        return self._row_to_entity(row) if row else None
+    
+    def _query_for_user(self, task_id: int, user_id: int, statuses: Optional[Sequence[TaskStatus]] = None):
+        """构建按任务ID、用户ID（及状态）过滤的查询"""
+        query = self.db.query(TaskModel).filter(
+            TaskModel.id == task_id,
+            TaskModel.user_id == user_id
+        )
+        if statuses:
+            query = query.filter(TaskModel.status.in_([status.value for status in statuses]))
+        return query
+    
+    def _fetch_entities(self, stmt) -> List[Task]:
+        """执行Core查询并将结果行批量构建为领域实体"""
+        return [self._row_to_entity(row) for row in self.db.execute(stmt).mappings()]
+    
+    @staticmethod
+    def _row_to_entity(row) -> Task:
+        """将Core查询结果行映射到领域实体"""
+        values = dict(row)
+        values["status"] = TaskStatus(values["status"])
+        return Task.from_db(**values)
     
     def _map_to_entity(self, db_task: TaskModel) -> Task:
         """将数据库模型映射到领域实体"""
-        return Task(
+        return Task.from_db(
             id=db_task.id,
             user_id=db_task.user_id,
             file_path=db_task.file_path,
@@ -1,8 +1,25 @@
+from dataclasses import fields
 from typing import Optional, List
+from sqlalchemy import bindparam, lambda_stmt, or_, select
 from sqlalchemy.orm import Session
 from app.domain.entities.user import User
 from app.domain.repositories.user_repository import UserRepositoryInterface
 from app.infrastructure.database.models.user import User as UserModel
+from app.infrastructure.database.models.task import Task as TaskModel
+from app.infrastructure.database.operations import delete_tasks, update_returning
+
+
+# 更新语句直接使用Core表对象
+_USER_TABLE = UserModel.__table__
+
+# 与用户实体字段顺序一致的列，查询结果可按位置构建实体
+_USER_COLUMNS = tuple(_USER_TABLE.c[field.name] for field in fields(User))
+
+# 认证热路径上按字段查找用户的语句，lambda_stmt缓存语句构建和编译结果，每次执行只绑定参数
+_BY_ID = lambda_stmt(lambda: select(UserModel).where(UserModel.id == bindparam("value")).limit(1))
+_BY_EMAIL = lambda_stmt(lambda: select(UserModel).where(UserModel.email == bindparam("value")).limit(1))
+_BY_USERNAME = lambda_stmt(lambda: select(UserModel).where(UserModel.username == bindparam("value")).limit(1))
+_BY_API_KEY = lambda_stmt(lambda: select(UserModel).where(UserModel.api_key == bindparam("value")).limit(1))
 
 
 class UserRepository(UserRepositoryInterface):
@@ -26,62 +43,81 @@ class UserRepository(UserRepositoryInterface):
     
     def get_by_id(self, user_id: int) -> Optional[User]:
         """根据ID获取用户"""
-        db_user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
+        db_user = self._lookup(_BY_ID, user_id)
         if db_user:
             return self._map_to_entity(db_user)
         return None
     
     def get_by_email(self, email: str) -> Optional[User]:
         """根据邮箱获取用户"""
-        db_user = self.db.query(UserModel).filter(UserModel.email == email).first()
+        db_user = self._lookup(_BY_EMAIL, email)
         if db_user:
             return self._map_to_entity(db_user)
         return None
     
     def get_by_username(self, username: str) -> Optional[User]:
         """根据用户名获取用户"""
-        db_user = self.db.query(UserModel).filter(UserModel.username == username).first()
+        db_user = self._lookup(_BY_USERNAME, username)
+        if db_user:
+            return self._map_to_entity(db_user)
+        return None
+    
+    def get_by_username_or_email(self, username: str, email: str) -> Optional[User]:
+        """获取用户名或邮箱匹配的用户，用户名匹配优先"""
+        db_user = self.db.query(UserModel).filter(
+            or_(UserModel.username == username, UserModel.email == email)
+        ).order_by(
+            (UserModel.username == username).desc()
+        ).first()
         if db_user:
             return self._map_to_entity(db_user)
         return None
     
     def get_by_api_key(self, api_key: str) -> Optional[User]:
         """根据API密钥获取用户"""
-        db_user = self.db.query(UserModel).filter(UserModel.api_key == api_key).first()
+        db_user = self._lookup(_BY_API_KEY, api_key)
         if db_user:
             return self._map_to_entity(db_user)
         return None
     
     def update(self, user: User) -> User:
         """更新用户信息"""
-        db_user = self.db.query(UserModel).filter(UserModel.id == user.id).first()
-        if db_user:
-            db_user.username = user.username
-            db_user.email = user.email
-            db_user.hashed_password = user.hashed_password
-            db_user.api_key = user.api_key
-            self.db.commit()
-            self.db.refresh(db_user)
-            return self._map_to_entity(db_user)
+        row = update_returning(
+            self.db,
+            _USER_TABLE,
+            _USER_TABLE.c.id == user.id,
+            {
+                "username": user.username,
+                "email": user.email,
+                "hashed_password": user.hashed_password,
+                "api_key": user.api_key
+            },
+            _USER_COLUMNS
+        )
+        self.db.commit()
+        if row:
+            return User(*row.values())
         raise ValueError(f"User with id {user.id} not found")
     
     def delete(self, user_id: int) -> bool:
-        """删除用户"""
-        db_user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
-        if db_user:
-            self.db.delete(db_user)
-            self.db.commit()
-            return True
-        return False
+        """删除用户及其任务和字幕"""
+        delete_tasks(self.db, TaskModel.user_id == user_id)
+        rowcount = self.db.query(UserModel).filter(UserModel.id == user_id).delete(synchronize_session=False)
+        self.db.commit()
+        return rowcount > 0
+    
+    def _lookup(self, stmt, value) -> Optional[UserModel]:
+        """执行按字段查找用户的缓存语句"""
+        return self.db.execute(stmt, {"value": value}).scalars().first()
     
     def _map_to_entity(self, db_user: UserModel) -> User:
-        """将数据库模型映射到领域实体"""
+        """将数据库模型映射到领域实体，按字段顺序传入位置参数"""
         return User(
-            id=db_user.id,
-            username=db_user.username,
-            email=db_user.email,
-            hashed_password=db_user.hashed_password,
-            api_key=db_user.api_key,
-            created_at=db_user.created_at,
-            updated_at=db_user.updated_at
+            db_user.id,
+            db_user.username,
+            db_user.email,
+            db_user.hashed_password,
+            db_user.api_key,
+            db_user.created_at,
+            db_user.updated_at
         )
\ No newline at end of file
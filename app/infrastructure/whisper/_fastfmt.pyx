@@ -0,0 +1,19 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+字幕时间戳格式化的Cython实现
+
+编译：cythonize -i app/infrastructure/whisper/_fastfmt.pyx
+未编译时whisper_service使用等价的纯Python实现。
+"""
+
+
+cpdef str format_timestamp(double seconds, str separator=","):
+    """格式化时间戳为SRT格式，separator为毫秒前的分隔符（VTT使用"."）"""
+    cdef long long milliseconds = <long long>(seconds * 1000)
+    cdef long long hours = milliseconds // 3600000
+    milliseconds -= hours * 3600000
+    cdef long long minutes = milliseconds // 60000
+    milliseconds -= minutes * 60000
+    cdef long long secs = milliseconds // 1000
+    milliseconds -= secs * 1000
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
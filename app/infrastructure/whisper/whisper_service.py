@@ -1,137 +1,235 @@
 import os
-import whisper
+import ctranslate2
 import ffmpeg
-from typing import Dict, List, Optional, Tuple
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from faster_whisper.audio import SAMPLE_RATE
+from faster_whisper.transcribe import Segment
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from app.config import settings
 
+try:
+    # 编译后的Cython实现，见_fastfmt.pyx
+    from app.infrastructure.whisper._fastfmt import format_timestamp
+except ImportError:
+    def format_timestamp(seconds: float, separator: str = ",") -> str:
+        """格式化时间戳为SRT格式，separator为毫秒前的分隔符（VTT使用"."）"""
+        milliseconds = int(seconds * 1000)
+        hours, milliseconds = divmod(milliseconds, 3_600_000)
+        minutes, milliseconds = divmod(milliseconds, 60_000)
+        seconds, milliseconds = divmod(milliseconds, 1000)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def _device_and_compute_type() -> Tuple[str, str]:
+    """
+    根据是否有可用GPU选择推理设备和精度
+    
+    WHISPER_COMPUTE_TYPE为auto时GPU使用int8_float16、CPU使用int8；
+    也可以显式指定float16、bfloat16、int8_bfloat16等CTranslate2支持的类型。
+    设备不支持指定的类型时，CTranslate2会自动换用最接近的类型。
+    """
+    device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    compute_type = settings.WHISPER_COMPUTE_TYPE
+    if compute_type == "auto":
+        compute_type = "int8_float16" if device == "cuda" else "int8"
+    return device, compute_type
+
+
+# 短于一个Whisper窗口（30秒）的音频不走批量解码，避免单批次的额外开销
+BATCHED_MIN_DURATION = 30.0
+
+# 批量解码时按静音切分音频：每段不超过一个Whisper窗口，至少100毫秒的静音即可作为切分点
+BATCH_CHUNK_LENGTH = 30
+VAD_MIN_SILENCE_MS = 100
+
+# 预生成的字幕序号行，覆盖绝大多数字幕文件的段数，超出部分临时格式化
+_CUE_NUMBERS = tuple(f"{i}\n" for i in range(1, 10_001))
+
+
+def _vtt_timestamp(timestamp: str) -> str:
+    """将SRT时间戳转换为VTT格式，两者只有毫秒前的分隔符不同"""
+    return f"{timestamp[:-4]}.{timestamp[-3:]}"
+
+
+def _format_cue(number: str, start: str, end: str, text: str) -> str:
+    """拼接单个字幕块，number为已带换行的序号行"""
+    return f"{number}{start} --> {end}\n{text}\n"
+
 
 class WhisperService:
-    """Whisper语音识别服务"""
+    """Whisper语音识别服务（基于faster-whisper/CTranslate2）"""
     
     def __init__(self):
         self.model_path = settings.WHISPER_MODEL_PATH
         self.default_model = settings.WHISPER_MODEL
+        self.batch_size = settings.WHISPER_BATCH_SIZE
+        self.cpu_threads = settings.WHISPER_CPU_THREADS
         self.models = {}  # 缓存已加载的模型
+        self.pipelines = {}  # 缓存模型对应的批量推理管线
     
-    def load_model(self, model_name: str) -> whisper.Whisper:
+    def load_model(self, model_name: str) -> WhisperModel:
         """加载Whisper模型"""
         if model_name not in self.models:
-            # 检查模型是否已下载
+            device, compute_type = _device_and_compute_type()
+            # 检查模型是否已转换并保存在本地
             model_path = os.path.join(self.model_path, model_name)
             if not os.path.exists(model_path):
-                # 模型不存在，让whisper自动下载
-                self.models[model_name] = whisper.load_model(model_name)
-            else:
-                # 从本地加载模型
-                self.models[model_name] = whisper.load_model(model_path)
+                # 模型不存在，自动下载到模型目录
+                model_path = model_name
+            self.models[model_name] = WhisperModel(
+                model_path,
+                device=device,
+                compute_type=compute_type,
+                # 每个进程一个模型、串行处理任务，并行度由worker进程数决定
+                cpu_threads=self.cpu_threads,
+                num_workers=1,
+                download_root=self.model_path
+            )
         return self.models[model_name]
     
+    def load_pipeline(self, model_name: str) -> BatchedInferencePipeline:
+        """获取模型对应的批量推理管线"""
+        if model_name not in self.pipelines:
+            self.pipelines[model_name] = BatchedInferencePipeline(model=self.load_model(model_name))
+        return self.pipelines[model_name]
+    
+    def warmup(self, model_name: str = None) -> None:
+        """加载模型并对1秒静音做一次转录，提前完成首次推理的初始化开销"""
+        if model_name is None:
+            model_name = self.default_model
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        # 关闭VAD，否则静音会被整体过滤而不会经过解码器
+        segments, _ = self.load_model(model_name).transcribe(silence, vad_filter=False, language="en")
+        for _ in segments:
+            pass
+    
+    def is_loaded(self, model_name: str) -> bool:
+        """模型是否已加载到当前进程"""
+        return model_name in self.models
+    
     def transcribe(
         self, 
-        audio_path: str, 
+        audio: Union[str, np.ndarray], 
         model_name: str = None, 
         language: str = "auto",
         progress_callback = None
-    ) -> Dict:
+    ) -> List[Segment]:
         """
         转录音频文件
         
         Args:
-            audio_path: 音频文件路径
-            model_name: Whisper模型名称 (tiny, base, small, medium, large)
+            audio: 音视频文件路径，或已解码的16kHz单声道float32采样
+            model_name: Whisper模型名称 (tiny, base, small, medium, large-v3)
             language: 语言代码，"auto"表示自动检测
-            progress_callback: 进度回调函数，接收进度百分比
+            progress_callback: 进度回调函数，接收0到1之间的进度
         
         Returns:
-            转录结果字典
+            转录得到的片段列表
         """
         if model_name is None:
             model_name = self.default_model
         
-        # 加载模型
-        model = self.load_model(model_name)
+        # 解码一次音频，根据时长选择批量或顺序解码
+        if isinstance(audio, str):
+            audio = self.load_audio(audio)
+        language = language if language != "auto" else None
         
-        # 转录
-        result = model.transcribe(
-            audio_path,
-            language=language if language != "auto" else None,
-            verbose=True
-        )
+        # 转录，返回的片段是惰性生成的，逐段解码
+        if len(audio) / SAMPLE_RATE >= BATCHED_MIN_DURATION:
+            segments, info = self.load_pipeline(model_name).transcribe(
+                audio,
+                language=language,
+                batch_size=self.batch_size,
+                chunk_length=BATCH_CHUNK_LENGTH,
+                vad_filter=True,
+                # 每次传入新的字典，管线会修改传入的参数
+                vad_parameters={"min_silence_duration_ms": VAD_MIN_SILENCE_MS},
+                word_timestamps=False
+            )
+        else:
+            segments, info = self.load_model(model_name).transcribe(
+                audio,
+                language=language,
+                vad_filter=True,
+                word_timestamps=False
+            )
+        
+        result = []
+        for segment in segments:
+            result.append(segment)
+            if progress_callback and info.duration:
+                progress_callback(min(segment.end / info.duration, 1.0))
         
         return result
     
-    def extract_audio(self, video_path: str, audio_path: str) -> bool:
+    def load_audio(self, file_path: str) -> np.ndarray:
         """
-        从视频文件中提取音频
+        使用ffmpeg将音视频文件解码为Whisper使用的16kHz单声道float32数组，通过管道读取，不写临时文件
         
         Args:
-            video_path: 视频文件路径
-            audio_path: 输出音频文件路径
+            file_path: 音频或视频文件路径
         
         Returns:
-            是否成功
+            归一化到[-1, 1]的音频采样
+        
+        Raises:
+            ValueError: 如果ffmpeg解码失败
         """
         try:
-            (
+            out, _ = (
                 ffmpeg
-                .input(video_path)
-                .output(audio_path, acodec="pcm_s16le", ac=1, ar="16k")
-                .overwrite_output()
+                # -threads放在-i之前才作用于解码器，0表示由ffmpeg按CPU核数自动选择
+                .input(file_path, threads=0)
+                .output(
+                    "-",
+                    format="s16le",
+                    acodec="pcm_s16le",
+                    ac=1,
+                    ar=SAMPLE_RATE
+                )
                 .run(capture_stdout=True, capture_stderr=True)
             )
-            return True
         except ffmpeg.Error as e:
-            print(f"FFmpeg error: {e.stderr.decode()}")
-            return False
+            raise ValueError(f"Failed to extract audio: {e.stderr.decode(errors='replace')}") from e
+        return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
     
-    def format_timestamp(self, seconds: float) -> str:
-        """格式化时间戳为SRT格式"""
-        milliseconds = int(seconds * 1000)
-        hours = milliseconds // 3600000
-        milliseconds %= 3600000
-        minutes = milliseconds // 60000
-        milliseconds %= 60000
-        seconds = milliseconds // 1000
-        milliseconds %= 1000
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
-    
-    def generate_srt(self, segments: List[Dict]) -> str:
+    def format_timestamp(self, seconds: float, separator: str = ",") -> str:
+        """格式化时间戳为SRT格式，separator为毫秒前的分隔符（VTT使用"."）"""
+        return format_timestamp(seconds, separator)
+    
+    def _cue_parts(self, segments: List[Segment]) -> Iterator[Tuple[str, str, str, str]]:
+        """逐段生成字幕块的序号行、SRT格式的起止时间戳和文本，各格式共用"""
+        fmt = format_timestamp
+        numbers = _CUE_NUMBERS
+        count = len(numbers)
+        for i, segment in enumerate(segments):
+            number = numbers[i] if i < count else f"{i + 1}\n"
+            yield number, fmt(segment.start), fmt(segment.end), segment.text.strip()
+    
+    def _cues(self, segments: List[Segment], vtt: bool = False) -> Iterator[str]:
+        """逐段生成带序号和时间轴的字幕块"""
+        for number, start, end, text in self._cue_parts(segments):
+            if vtt:
+                start, end = _vtt_timestamp(start), _vtt_timestamp(end)
+            yield _format_cue(number, start, end, text)
+    
+    def generate_srt(self, segments: List[Segment]) -> str:
         """生成SRT格式字幕"""
-        srt_content = []
-        for i, segment in enumerate(segments, 1):
-            start_time = self.format_timestamp(segment["start"])
-            end_time = self.format_timestamp(segment["end"])
-            text = segment["text"].strip()
-            
-            srt_content.append(str(i))
-            srt_content.append(f"{start_time} --> {end_time}")
-            srt_content.append(text)
-            srt_content.append("")
-        
-        return "\n".join(srt_content)
-    
-    def generate_vtt(self, segments: List[Dict]) -> str:
+        return "\n".join(self._cues(segments))
+    
+    def generate_vtt(self, segments: List[Segment]) -> str:
         """生成VTT格式字幕"""
-        vtt_content = ["WEBVTT", ""]
-        for i, segment in enumerate(segments, 1):
-            start_time = self.format_timestamp(segment["start"]).replace(",", ".")
-            end_time = self.format_timestamp(segment["end"]).replace(",", ".")
-            text = segment["text"].strip()
-            
-            vtt_content.append(f"{i}")
-            vtt_content.append(f"{start_time} --> {end_time}")
-            vtt_content.append(text)
-            vtt_content.append("")
-        
-        return "\n".join(vtt_content)
-    
-    def generate_txt(self, segments: List[Dict]) -> str:
+        return "\n".join(chain(("WEBVTT", ""), self._cues(segments, vtt=True)))
+    
+    def generate_txt(self, segments: List[Segment]) -> str:
         """生成纯文本格式字幕"""
-        return "\n".join(segment["text"].strip() for segment in segments)
+        return "\n".join(segment.text.strip() for segment in segments)
     
     def generate_subtitles(
         self, 
-        audio_path: str, 
+        audio: Union[str, np.ndarray], 
         model_name: str = None, 
         language: str = "auto",
         formats: List[str] = None,
@@ -141,7 +239,7 @@ class WhisperService:
         生成多种格式的字幕
         
         Args:
-            audio_path: 音频文件路径
+            audio: 音视频文件路径，或已解码的音频采样
             model_name: Whisper模型名称
             language: 语言代码
             formats: 要生成的字幕格式列表，默认["srt", "vtt", "txt"]
@@ -154,17 +252,47 @@ class WhisperService:
             formats = ["srt", "vtt", "txt"]
         
         # 转录音频
-        result = self.transcribe(audio_path, model_name, language, progress_callback)
+        segments = self.transcribe(audio, model_name, language, progress_callback)
         
         # 生成字幕
-        subtitles = {}
-        if "srt" in formats:
-            subtitles["srt"] = self.generate_srt(result["segments"])
-        if "vtt" in formats:
-            subtitles["vtt"] = self.generate_vtt(result["segments"])
-        if "txt" in formats:
-            subtitles["txt"] = self.generate_txt(result["segments"])
+        return self.render_subtitles(segments, formats)
+    
+    def render_subtitles(self, segments: List[Segment], formats: List[str]) -> Dict[str, str]:
+        """
+        单次遍历片段同时生成多种格式的字幕，每段的文本和时间戳只处理一次
         
+        Args:
+            segments: 转录得到的片段列表
+            formats: 要生成的字幕格式列表
+        
+        Returns:
+            格式到字幕内容的映射字典，内容与generate_srt/generate_vtt/generate_txt一致
+        """
+        want_srt = "srt" in formats
+        want_vtt = "vtt" in formats
+        want_txt = "txt" in formats
+        if not (want_srt or want_vtt):
+            # 不需要时间轴时不格式化时间戳
+            return {"txt": self.generate_txt(segments)} if want_txt else {}
+        
+        srt_cues = []
+        vtt_cues = ["WEBVTT", ""]
+        txt_lines = []
+        for number, start, end, text in self._cue_parts(segments):
+            if want_txt:
+                txt_lines.append(text)
+            if want_srt:
+                srt_cues.append(_format_cue(number, start, end, text))
+            if want_vtt:
+                vtt_cues.append(_format_cue(number, _vtt_timestamp(start), _vtt_timestamp(end), text))
+        
+        subtitles = {}
+        if want_srt:
+            subtitles["srt"] = "\n".join(srt_cues)
+        if want_vtt:
+            subtitles["vtt"] = "\n".join(vtt_cues)
+        if want_txt:
+            subtitles["txt"] = "\n".join(txt_lines)
         return subtitles
 
 
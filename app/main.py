@@ -1,33 +1,49 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
+from fastapi.openapi.docs import (
+    get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
+)
 from fastapi.openapi.utils import get_openapi
 from sqlalchemy.exc import SQLAlchemyError
 import os
 import time
+import orjson
+from typing import Optional
 
 from app.config import settings
 from app.infrastructure.database.database import init_db
 from app.api import auth, tasks, subtitles, task_subtitles
 
+# OpenAPI文档和文档页面的路径
+OPENAPI_URL = f"{settings.API_PREFIX}/openapi.json"
+DOCS_URL = "/docs"
+DOCS_OAUTH2_REDIRECT_URL = "/docs/oauth2-redirect"
+REDOC_URL = "/redoc"
+
 # 创建FastAPI应用
+# 不使用FastAPI内置的文档路由（其每次请求都会重新序列化整个文档），下方注册使用预先序列化文档的路由
 app = FastAPI(
     title="Subtitle API",
     description="基于Whisper的音视频字幕生成API",
     version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
-    openapi_url=f"{settings.API_PREFIX}/openapi.json"
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None,
+    default_response_class=ORJSONResponse
 )
 
 # 配置CORS
+# 通配来源与凭证同时开启时，Starlette会将任意Origin原样返回并允许携带凭证，因此通配时关闭凭证
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # 在生产环境中应该设置为特定的域名
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=settings.CORS_ORIGINS,
+    allow_origin_regex=settings.CORS_ORIGIN_REGEX,
+    allow_credentials="*" not in settings.CORS_ORIGINS,
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=settings.CORS_MAX_AGE,
 )
 
 
@@ -35,7 +51,7 @@ app.add_middleware(
 @app.exception_handler(SQLAlchemyError)
 async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
     """处理SQLAlchemy异常"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "Database error", "error": str(exc)},
     )
@@ -44,7 +60,7 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """处理请求验证异常"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={"detail": "Validation error", "errors": exc.errors()},
     )
@@ -53,7 +69,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """处理一般异常"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "Internal server error", "error": str(exc)},
     )
@@ -79,10 +95,50 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 
+def _openapi_bytes() -> bytes:
+    """返回序列化后的OpenAPI文档，只在首次调用时生成"""
+    openapi_bytes = getattr(app.state, "openapi_bytes", None)
+    if openapi_bytes is None:
+        openapi_bytes = orjson.dumps(app.openapi())
+        app.state.openapi_bytes = openapi_bytes
+    return openapi_bytes
+
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_json():
+    """OpenAPI文档"""
+    return Response(content=_openapi_bytes(), media_type="application/json")
+
+
+@app.get(DOCS_URL, include_in_schema=False)
+async def swagger_ui_html():
+    """Swagger UI文档页面"""
+    return get_swagger_ui_html(
+        openapi_url=OPENAPI_URL,
+        title=f"{app.title} - Swagger UI",
+        oauth2_redirect_url=DOCS_OAUTH2_REDIRECT_URL
+    )
+
+
+@app.get(DOCS_OAUTH2_REDIRECT_URL, include_in_schema=False)
+async def swagger_ui_oauth2_redirect():
+    """Swagger UI的OAuth2回调页面"""
+    return get_swagger_ui_oauth2_redirect_html()
+
+
+@app.get(REDOC_URL, include_in_schema=False)
+async def redoc_html():
+    """ReDoc文档页面"""
+    return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{app.title} - ReDoc")
+
+
 # 依赖项覆盖：替换tasks.py中的临时依赖
-def override_get_current_user(current_user: auth.UserResponse = auth.Depends(auth.get_current_active_user)):
-    """覆盖获取当前用户的依赖"""
-    return current_user
+async def override_get_current_user(
+    current_user_from_api: Optional[auth.UserResponse] = auth.Depends(tasks.get_current_user_from_api_key),
+    current_user_from_token: Optional[auth.UserResponse] = auth.Depends(auth.get_current_user_from_token)
+) -> auth.UserResponse:
+    """覆盖获取当前用户的依赖（JWT令牌与API密钥按凭证格式分别处理）"""
+    return await tasks.get_current_user(current_user_from_api, current_user_from_token)
 
 
 # 注册路由
@@ -113,8 +169,8 @@ async def root():
     """根路径"""
     return {
         "message": "Welcome to Subtitle API",
-        "docs": "/docs",
-        "redoc": "/redoc"
+        "docs": DOCS_URL,
+        "redoc": REDOC_URL
     }
 
 
@@ -129,6 +185,9 @@ async def startup_event():
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     os.makedirs(settings.WHISPER_MODEL_PATH, exist_ok=True)
     
+    # 预先生成并序列化OpenAPI文档，首次访问/docs时无需等待
+    _openapi_bytes()
+    
     print("Application startup complete")
 
 
@@ -141,4 +200,12 @@ async def shutdown_event():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=settings.WEB_WORKERS,
+        loop="uvloop",
+        http="httptools",
+        reload=settings.DEBUG
+    )
\ No newline at end of file
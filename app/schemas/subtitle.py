@@ -1,11 +1,14 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
+
+# 支持的字幕格式
+SubtitleFormat = Literal["srt", "vtt", "txt"]
 
 
 class SubtitleBase(BaseModel):
     """字幕基础模型"""
-    format: str = Field(..., pattern="^(srt|vtt|txt)$")
+    format: SubtitleFormat
 
 
 class SubtitleCreate(SubtitleBase):
@@ -26,8 +29,7 @@ class SubtitleResponse(SubtitleBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SubtitleDetailResponse(SubtitleResponse):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional, List
 from enum import Enum
@@ -41,8 +41,7 @@ class TaskResponse(TaskBase):
     updated_at: datetime
     completed_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TaskListResponse(BaseModel):
@@ -78,4 +77,6 @@ class TaskCreateResponse(BaseModel):
     status: TaskStatus
     progress: int
     priority: int
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -7,14 +7,18 @@ import os
 import sys
 import time
 import json
-import requests
+import httpx
 import argparse
 from pathlib import Path
+from urllib.parse import unquote
 
 # API基础URL
 BASE_URL = "http://localhost:8000/api"
 HEALTH_URL = "http://localhost:8000/health"
 
+# 所有请求共用一个客户端，复用TCP连接
+client = httpx.Client(timeout=30.0)
+
 
 def print_step(step):
     """打印步骤信息"""
@@ -38,7 +42,7 @@ def print_response(response):
 def test_health():
     """测试健康检查端点"""
     print_step("Testing Health Check Endpoint")
-    response = requests.get(HEALTH_URL)
+    response = client.get(HEALTH_URL)
     print_response(response)
     return response.status_code == 200
 
@@ -52,7 +56,7 @@ def register_user(username, email, password):
         "email": email,
         "password": password
     }
-    response = requests.post(url, json=payload)
+    response = client.post(url, json=payload)
     print_response(response)
     
     if response.status_code == 201:
@@ -68,7 +72,7 @@ def login_user(email, password):
         "email": email,
         "password": password
     }
-    response = requests.post(url, json=payload)
+    response = client.post(url, json=payload)
     print_response(response)
     
     if response.status_code == 200:
@@ -92,11 +96,6 @@ def create_task(token, file_path, language="auto", model="base", priority=0):
     # 获取文件名
     filename = os.path.basename(file_path)
     
-    # 准备文件
-    files = {
-        "file": (filename, open(file_path, "rb"))
-    }
-    
     # 准备表单数据
     data = {
         "language": language,
@@ -104,7 +103,12 @@ def create_task(token, file_path, language="auto", model="base", priority=0):
         "priority": str(priority)
     }
     
-    response = requests.post(url, headers=headers, files=files, data=data)
+    # 上传文件，请求结束后关闭文件
+    with open(file_path, "rb") as fh:
+        files = {
+            "file": (filename, fh)
+        }
+        response = client.post(url, headers=headers, files=files, data=data)
     print_response(response)
     
     if response.status_code == 201:
@@ -120,7 +124,7 @@ def get_task_status(token, task_id):
         "Authorization": f"Bearer {token}"
     }
     
-    response = requests.get(url, headers=headers)
+    response = client.get(url, headers=headers)
     print_response(response)
     
     if response.status_code == 200:
@@ -162,7 +166,7 @@ def get_task_subtitles(token, task_id):
         "Authorization": f"Bearer {token}"
     }
     
-    response = requests.get(url, headers=headers)
+    response = client.get(url, headers=headers)
     print_response(response)
     
     if response.status_code == 200:
@@ -178,28 +182,34 @@ def download_subtitle(token, subtitle_id, output_dir="."):
         "Authorization": f"Bearer {token}"
     }
     
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
+    with client.stream("GET", url, headers=headers) as response:
+        if response.status_code != 200:
+            response.read()
+            print_response(response)
+            return None
+        
         # 获取文件名
         content_disposition = response.headers.get("Content-Disposition", "")
         filename = None
-        if "filename=" in content_disposition:
-            filename = content_disposition.split("filename=")[1].strip('"')
+        for param in content_disposition.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "filename*" and value.startswith("UTF-8''"):
+                filename = unquote(value[len("UTF-8''"):])
+                break
+            if name == "filename":
+                filename = value.strip('"')
         
         if not filename:
             filename = f"subtitle_{subtitle_id}.srt"
         
-        # 保存文件
+        # 边下载边写入文件
         output_path = os.path.join(output_dir, filename)
         with open(output_path, "wb") as f:
-            f.write(response.content)
-        
-        print(f"Subtitle downloaded successfully: {output_path}")
-        return output_path
-    else:
-        print_response(response)
-        return None
+            for chunk in response.iter_bytes(65536):
+                f.write(chunk)
+    
+    print(f"Subtitle downloaded successfully: {output_path}")
+    return output_path
 
 
 def main():
@@ -275,4 +285,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with client:
+        main()
\ No newline at end of file
@@ -1,7 +1,7 @@
 import sys
 import os
 import tempfile
-import requests
+import httpx
 
 # 创建一个临时的音频文件
 with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
@@ -9,11 +9,14 @@ with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
     f.write(b"RIFF$\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00D\xac\x00\x00\x88X\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00")
     temp_file_path = f.name
 
+# 所有请求共用一个客户端，复用TCP连接
+client = httpx.Client(base_url="http://localhost:8000/api", timeout=30.0)
+
 try:
     # 注册一个用户
     print("Registering user...")
-    register_response = requests.post(
-        "http://localhost:8000/api/auth/register",
+    register_response = client.post(
+        "/auth/register",
         json={
             "username": "testuser_task",
             "email": "test_task@example.com",
@@ -24,8 +27,8 @@ try:
     
     # 登录获取令牌
     print("\nLogging in...")
-    login_response = requests.post(
-        "http://localhost:8000/api/auth/login/json",
+    login_response = client.post(
+        "/auth/login/json",
         json={
             "email": "test_task@example.com",
             "password": "testpassword123"
@@ -39,8 +42,8 @@ try:
         print("\nCreating task...")
         headers = {"Authorization": f"Bearer {token}"}
         with open(temp_file_path, "rb") as f:
-            task_response = requests.post(
-                "http://localhost:8000/api/tasks",
+            task_response = client.post(
+                "/tasks",
                 headers=headers,
                 files={"file": f},
                 data={
@@ -60,8 +63,8 @@ try:
             
             # 检查任务状态
             print("\nChecking task status...")
-            status_response = requests.get(
-                f"http://localhost:8000/api/tasks/{task_id}",
+            status_response = client.get(
+                f"/tasks/{task_id}",
                 headers=headers
             )
             print(f"Task status: {status_response.status_code}")
@@ -73,4 +76,5 @@ finally:
     # 清理临时文件
     if os.path.exists(temp_file_path):
         os.remove(temp_file_path)
+    client.close()
     print("\nTest completed!")
\ No newline at end of file
@@ -0,0 +1,164 @@
+import importlib
+import sys
+import types
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.domain.entities.task import Task, TaskStatus
+
+_SUBTITLE_TASKS = "app.infrastructure.celery.tasks.subtitle_tasks"
+
+# 仓库中不包含ORM模型，依赖模型的存储库和依赖推理库的Whisper服务在导入任务模块时替换为空模块，
+# 其中被导入的名称在测试中再替换为内存实现
+_STUB_MODULES = {
+    "app.infrastructure.database.models": (),
+    "app.infrastructure.database.models.user": (),
+    "app.infrastructure.database.models.task": (),
+    "app.infrastructure.database.models.subtitle": (),
+    "app.infrastructure.database.repositories.task_repository": ("TaskRepository",),
+    "app.infrastructure.database.repositories.subtitle_repository": ("SubtitleRepository",),
+    "app.infrastructure.whisper.whisper_service": ("whisper_service",),
+}
+
+
+@pytest.fixture(scope="module")
+def subtitle_tasks():
+    """导入字幕任务模块，只导入一次，避免Celery任务以旧模块的全局变量重复注册"""
+    for name in ("celery", "sqlalchemy", "pydantic_settings"):
+        pytest.importorskip(name)
+    with pytest.MonkeyPatch.context() as mp:
+        for name, attributes in _STUB_MODULES.items():
+            stub = types.ModuleType(name)
+            for attribute in attributes:
+                setattr(stub, attribute, None)
+            mp.setitem(sys.modules, name, stub)
+        module = importlib.import_module(_SUBTITLE_TASKS)
+    yield module
+    sys.modules.pop(_SUBTITLE_TASKS, None)
+
+
+class FakeTaskRepository:
+    """内存中的任务存储库，记录状态和进度写入"""
+
+    def __init__(self, task: Task):
+        self.task = task
+        # (目标状态, 排除的状态, 是否写入)
+        self.status_writes = []
+
+    def get_by_id(self, task_id: int):
+        return self.task if self.task.id == task_id else None
+
+    def update_status(
+        self, task_id: int, status: TaskStatus, commit: bool = True, excluded_statuses=()
+    ) -> bool:
+        written = self.task.status not in excluded_statuses
+        self.status_writes.append((status, tuple(excluded_statuses), written))
+        if written:
+            self.task.status = status
+        return written
+
+    def update_progress(self, task_id: int, progress: int, commit: bool = True) -> bool:
+        self.task.progress = progress
+        return True
+
+
+class FakeWhisperService:
+    """逐段回调进度（每段1%），在两次节流检查之间触发取消"""
+
+    def __init__(self, on_cancel, cancel_at: int = 52):
+        self.on_cancel = on_cancel
+        self.cancel_at = cancel_at
+
+    def load_audio(self, file_path: str):
+        return object()
+
+    def generate_subtitles(self, audio, model_name, language, formats, progress_callback):
+        for step in range(1, 101):
+            progress_callback(step / 100)
+            if step == self.cancel_at:
+                self.on_cancel()
+        return {format: "1\n00:00:00,000 --> 00:00:01,000\nhi\n" for format in formats}
+
+
+@pytest.fixture
+def task_repo():
+    return FakeTaskRepository(Task.from_db(
+        id=1,
+        user_id=1,
+        file_path="/tmp/audio.wav",
+        filename="audio.wav",
+        language="auto",
+        model="base",
+        status=TaskStatus.PENDING,
+        progress=0,
+        priority=0,
+    ))
+
+
+@pytest.fixture
+def run_task(monkeypatch, subtitle_tasks, task_repo):
+    """以内存存储库运行生成任务，返回(结果, 结果后端状态序列, 挂有db和subtitle_repo的Mock)"""
+    task = subtitle_tasks.generate_subtitles_task
+
+    def run(cancel_at: int):
+        # 结果后端中记录的任务状态序列，最后一项为当前状态
+        states = []
+
+        def cancel():
+            # 与cancel_task_task一致：先将任务标记为已取消，再通知生成任务停止
+            task_repo.update_status(1, TaskStatus.CANCELED)
+            states.append("ABORTED")
+
+        # 会话和字幕存储库挂在同一个Mock下，以便检查调用顺序
+        session = MagicMock()
+        db = session.db
+        subtitle_repo = session.subtitle_repo
+        monkeypatch.setattr(subtitle_tasks, "SessionLocal", lambda: db)
+        monkeypatch.setattr(subtitle_tasks, "TaskRepository", lambda db: task_repo)
+        monkeypatch.setattr(subtitle_tasks, "SubtitleRepository", lambda db: subtitle_repo)
+        monkeypatch.setattr(subtitle_tasks, "whisper_service", FakeWhisperService(cancel, cancel_at))
+        monkeypatch.setattr(subtitle_tasks.os.path, "exists", lambda path: True)
+        monkeypatch.setattr(
+            task, "is_aborted", lambda **kwargs: bool(states) and states[-1] == "ABORTED", raising=False
+        )
+        monkeypatch.setattr(
+            task, "update_state", lambda state=None, meta=None, **kwargs: states.append(state), raising=False
+        )
+        return task.run(1), states, session
+
+    return run
+
+
+def test_abort_mid_transcription_ends_canceled(run_task, task_repo):
+    result, states, session = run_task(cancel_at=52)
+
+    assert result == {"status": "canceled", "task_id": 1}
+    assert task_repo.task.status == TaskStatus.CANCELED
+    # 取消后不再写入PROGRESS，结果后端保持ABORTED
+    assert states[-1] == "ABORTED"
+    session.subtitle_repo.create_many.assert_not_called()
+
+
+def test_cancel_after_transcription_discards_subtitles(run_task, task_repo):
+    # 最后一次进度回调之后才取消，完成状态的条件写入失败
+    result, states, session = run_task(cancel_at=100)
+
+    assert result == {"status": "canceled", "task_id": 1}
+    assert task_repo.task.status == TaskStatus.CANCELED
+    assert task_repo.status_writes[-1] == (TaskStatus.COMPLETED, (TaskStatus.CANCELED,), False)
+    # 字幕在同一事务中写入但未提交，随后被回滚
+    assert session.subtitle_repo.create_many.call_args.kwargs == {"commit": False}
+    assert [call[0] for call in session.mock_calls] == [
+        "subtitle_repo.create_many", "db.rollback", "db.close"
+    ]
+
+
+def test_completes_when_not_canceled(run_task, task_repo):
+    result, states, session = run_task(cancel_at=0)
+
+    assert result["status"] == "success"
+    assert task_repo.task.status == TaskStatus.COMPLETED
+    assert [call[0] for call in session.mock_calls] == [
+        "subtitle_repo.create_many", "db.commit", "db.close"
+    ]
@@ -0,0 +1,104 @@
+import pytest
+
+from app.infrastructure.cache import ttl_cache
+from app.infrastructure.cache.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """可手动推进的单调时钟"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", fake)
+    return fake
+
+
+def test_get_returns_value_before_expiry(clock):
+    cache = TTLCache(maxsize=10, ttl=5.0)
+    cache.set("a", 1)
+    clock.advance(4.9)
+    assert cache.get("a") == 1
+
+
+def test_get_drops_expired_entry(clock):
+    cache = TTLCache(maxsize=10, ttl=5.0)
+    cache.set("a", 1)
+    clock.advance(5.0)
+    assert cache.get("a", "missing") == "missing"
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_shorter_than_default(clock):
+    cache = TTLCache(maxsize=10, ttl=5.0)
+    cache.set("a", 1, ttl=1.0)
+    clock.advance(1.0)
+    assert cache.get("a") is None
+
+
+def test_per_entry_ttl_is_capped_at_default(clock):
+    cache = TTLCache(maxsize=10, ttl=5.0)
+    cache.set("a", 1, ttl=3600.0)
+    clock.advance(4.9)
+    assert cache.get("a") == 1
+    clock.advance(0.1)
+    assert cache.get("a") is None
+
+
+def test_evicts_least_recently_used_at_maxsize(clock):
+    cache = TTLCache(maxsize=2, ttl=5.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # 读取a后b成为最久未使用的条目
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_overwrite_does_not_grow_cache(clock):
+    cache = TTLCache(maxsize=2, ttl=5.0)
+    cache.set("a", 1)
+    cache.set("a", 2)
+    assert len(cache) == 1
+    assert cache.get("a") == 2
+
+
+def test_pop_removes_entry(clock):
+    cache = TTLCache(maxsize=10, ttl=5.0)
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.get("a") is None
+    assert cache.pop("a", "missing") == "missing"
+
+
+def test_evict_removes_matching_values(clock):
+    cache = TTLCache(maxsize=10, ttl=5.0)
+    cache.set("a", {"user_id": 1})
+    cache.set("b", {"user_id": 2})
+    cache.set("c", {"user_id": 1})
+    assert cache.evict(lambda value: value["user_id"] == 1) == 2
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+    assert cache.get("b") == {"user_id": 2}
+
+
+def test_clear_removes_all_entries(clock):
+    cache = TTLCache(maxsize=10, ttl=5.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get("a") is None